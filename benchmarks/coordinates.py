@@ -0,0 +1,82 @@
+"""
+Compares coordinate extraction from Google Maps links against the
+split-based parser it replaced, over a large mix of link shapes: place
+pins with and without trailing data, `q=`/`query=` searches, directions
+to a point, bare map views, and links with no coordinates at all.
+
+    python -m benchmarks.coordinates
+    python -m benchmarks.coordinates --links 100000 --runs 5
+"""
+
+import argparse
+import random
+import time
+
+from utils.coordinates import extract, extract_many
+
+SHAPES = [
+    "https://www.google.pl/maps/place/Miejscowo%C5%9B%C4%87+{i}/@{lat},{lon},17z/data=!3m1!4b1!4m5!3m4!1s0x4723:0x{i:x}!8m2!3d{lat}!4d{lon}",
+    "https://www.google.com/maps/place/Point+{i}/@{lat},{lon},15z/data=!4m6!3m5!1s0x47:0x{i:x}!8m2!3d{lat}!4d{lon}!16s%2Fg%2F11c{i}?entry=ttu",
+    "https://www.google.com/maps/dir//{lat},{lon}",
+    "https://maps.google.com/?q={lat},{lon}",
+    "https://www.google.com/maps/search/?api=1&query={lat}%2C{lon}",
+    "https://www.google.com/maps/@{lat},{lon},14z",
+    "https://goo.gl/maps/{i:x}",
+]
+
+
+def split_based(url):
+    """The parser `gmaps_url_to_lat_lon` used to be."""
+    if "!3d" in url:
+        return url.split("!3d")[1].split("!4d")
+    else:
+        return url.split("/")[6].split(",")
+
+
+def make_links(count, seed=0):
+    rng = random.Random(seed)
+    links = []
+    for i in range(count):
+        shape = rng.choice(SHAPES)
+        links.append(shape.format(i=i, lat=f"{rng.uniform(44, 52):.7f}", lon=f"{rng.uniform(16, 30):.7f}"))
+    return links
+
+
+def run(name, func, links, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        results = func(links)
+        best = min(best, time.perf_counter() - start)
+    return name, best, results
+
+
+def old_parser(links):
+    results = []
+    for link in links:
+        try:
+            lat, lon = split_based(link)
+            results.append((float(lat), float(lon)))
+        except (IndexError, ValueError):
+            results.append(None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    links = make_links(args.links)
+    for name, seconds, results in (
+        run("split-based", old_parser, links, args.runs),
+        run("extract", lambda links: [extract(link) for link in links], links, args.runs),
+        run("extract_many", extract_many, links, args.runs),
+    ):
+        parsed = sum(result is not None for result in results)
+        print(f"{name:>12}: {seconds * 1000:8.1f} ms, {seconds / len(links) * 1e6:5.2f} us/link, {parsed}/{len(links)} parsed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Saved copies of the source pages and maps, for benchmarks that shouldn't touch the network.
+
+The committed fixtures, in `fixtures/synthetic`, are SYNTHETIC: generated
+from templates, not recorded.  The pages hold the markup the scrapers look
+for, with filler text, wrapped in the navigation, footer, styles and
+scripts a government site ships around it.  The KML files follow the
+folder/placemark layout of the Google My Maps exports, with placeholder
+names and descriptions.  Their timings show relative costs, not what the
+real pages take.
+
+Record the live pages and maps into `fixtures/recorded` with:
+
+    python -m benchmarks.corpus
+
+Recorded copies are used instead of the synthetic ones wherever they exist,
+and every benchmark reports which kind it ran on.
+"""
+
+import os
+
+from scrapers.hungary_hu import HUNGARY_KML, HUNGARY_TARGET, HUNGARY_URL
+from scrapers.moldova_ro import MOLDOVA_KML, MOLDOVA_TARGET, MOLDOVA_UKRAINE_URL
+from scrapers.poland import POLAND_EN_URL, POLAND_PL_URL, POLAND_TARGET, POLAND_UA_URL
+from scrapers.romaina_ro import ROMANIA_INFO_TARGET, ROMANIA_INFO_URL, ROMANIA_MAP_TARGET, ROMANIA_MAP_URL
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SYNTHETIC_DIR = os.path.join(FIXTURES_DIR, "synthetic")
+RECORDED_DIR = os.path.join(FIXTURES_DIR, "recorded")
+
+# Fixture file name -> the URL it's a copy of.
+PAGES = {
+    "poland_pl.html": POLAND_PL_URL,
+    "poland_en.html": POLAND_EN_URL,
+    "poland_ua.html": POLAND_UA_URL,
+    "hungary_hu.html": HUNGARY_URL,
+    "moldova_ro.html": MOLDOVA_UKRAINE_URL,
+    "romania_ro_info.html": ROMANIA_INFO_URL,
+    "romania_ro_map.html": ROMANIA_MAP_URL,
+}
+
+# Fixture file name -> the map it's a copy of.
+KMLS = {
+    "hungary_hu.kml": HUNGARY_KML,
+    "moldova_ro.kml": MOLDOVA_KML,
+}
+
+FIXTURES = {**PAGES, **KMLS}
+
+# Fixture file name -> the container its scraper parses, see `utils.parsing.parse_html`.
+TARGETS = {
+    "poland_pl.html": POLAND_TARGET,
+    "poland_en.html": POLAND_TARGET,
+    "poland_ua.html": POLAND_TARGET,
+    "hungary_hu.html": HUNGARY_TARGET,
+    "moldova_ro.html": MOLDOVA_TARGET,
+    "romania_ro_info.html": ROMANIA_INFO_TARGET,
+    "romania_ro_map.html": ROMANIA_MAP_TARGET,
+}
+
+
+def path(name):
+    """Returns the path of the fixture called `name`: its recorded copy if there is one, else the synthetic one."""
+    recorded = os.path.join(RECORDED_DIR, name)
+    return recorded if os.path.exists(recorded) else os.path.join(SYNTHETIC_DIR, name)
+
+
+def is_synthetic(name):
+    return not os.path.exists(os.path.join(RECORDED_DIR, name))
+
+
+def describe(names=FIXTURES):
+    """Returns a line telling which of the fixtures `names` are synthetic, for benchmark reports."""
+    synthetic = [name for name in names if is_synthetic(name)]
+    if not synthetic:
+        return "fixtures: recorded"
+    if len(synthetic) == len(names):
+        return "fixtures: SYNTHETIC (templated, not recorded; record them with `python -m benchmarks.corpus`)"
+    return f"fixtures: recorded, except SYNTHETIC {', '.join(synthetic)}"
+
+
+def load(name):
+    """Returns the bytes of the fixture called `name`."""
+    with open(path(name), "rb") as f:
+        return f.read()
+
+
+def load_url(url):
+    """Returns the bytes of the fixture copied from `url`."""
+    for name, fixture_url in FIXTURES.items():
+        if fixture_url == url:
+            return load(name)
+    raise KeyError(f"No fixture for {url}")
+
+
+def record(fixtures=FIXTURES):
+    """Saves fresh copies of the live pages into `RECORDED_DIR`."""
+    from utils.fetch import fetch_all
+
+    os.makedirs(RECORDED_DIR, exist_ok=True)
+    for name, result in zip(fixtures, fetch_all(fixtures.values()).values()):
+        if isinstance(result, Exception):
+            print(f"{name}: {result}")
+            continue
+        with open(os.path.join(RECORDED_DIR, name), "wb") as f:
+            f.write(result.content)
+        print(f"{name}: {len(result.content)} bytes")
+
+
+if __name__ == "__main__":
+    record()
@@ -0,0 +1,65 @@
+"""
+Compares the general-line de-duplication against the quadratic
+list-membership loop it replaced, on growing synthetic inputs where about
+half the lines repeat an earlier one.
+
+    python -m benchmarks.dedupe
+    python -m benchmarks.dedupe --sizes 100 1000 10000 --runs 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from utils.postprocess import dedupe_general
+
+
+def list_membership(lines):
+    unique = []
+    for line in lines:
+        if line not in unique:
+            unique.append(line)
+    return unique
+
+
+def make_lines(count, seed=0):
+    rng = random.Random(seed)
+    distinct = [f"Line {i}: crossing point information {rng.random():.8f}" for i in range(count // 2 or 1)]
+    return [rng.choice(distinct) for _ in range(count)]
+
+
+def best_of(func, lines, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(lines)
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000, 10000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    candidates = {
+        "list membership": list_membership,
+        "exact": lambda lines: dedupe_general(lines, "exact"),
+        "near": lambda lines: dedupe_general(lines, "near"),
+    }
+    print(f"{'lines':>8}  " + "  ".join(f"{name:>18}" for name in candidates))
+    for size in args.sizes:
+        lines = make_lines(size)
+        expected = list_membership(lines)
+        assert dedupe_general(lines, "exact") == expected
+        cells = []
+        for func in candidates.values():
+            best, _ = best_of(func, lines, args.runs)
+            cells.append(f"{best * 1000:15.3f} ms")
+        print(f"{size:>8}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
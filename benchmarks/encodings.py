@@ -0,0 +1,83 @@
+"""
+Measures what declaring a page's encoding saves over detecting it, on the
+larger saved pages (Hungary and Poland), with each scraper's parser and target.
+
+For each page it times:
+
+- `detect`: bytes handed to the parser, which detects the encoding itself.
+- `declared`: bytes decoded with the declared encoding, then parsed as text.
+- `no-meta`: `detect` on the page with its `<meta charset>` removed, the
+  case where detection has to look harder.
+- `dammit` and `decode`: only turning the bytes into text, by the
+  parser's detection (`UnicodeDammit`) and by the declared encoding.
+- `charset_normalizer`: what `requests` spends guessing the encoding
+  (`response.apparent_encoding`) for a response whose headers don't name
+  one, when its `.text` is used.
+
+    python -m benchmarks.encodings
+    python -m benchmarks.encodings --runs 50
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+from bs4.dammit import UnicodeDammit
+
+from benchmarks.corpus import TARGETS, describe, load
+from utils.parsing import parse_html
+from scrapers.hungary_hu import HungaryScraper
+from scrapers.poland import PolandScraper
+
+PAGES = {
+    "hungary_hu.html": HungaryScraper,
+    "poland_pl.html": PolandScraper,
+    "poland_en.html": PolandScraper,
+    "poland_ua.html": PolandScraper,
+}
+
+_META_CHARSET = re.compile(rb"<meta[^>]*charset[^>]*>", re.IGNORECASE)
+
+
+def median_ms(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        import charset_normalizer
+    except ImportError:
+        charset_normalizer = None
+
+    columns = ["detect", "declared", "no-meta", "dammit", "decode", "charset_normalizer"]
+    print(describe(PAGES))
+    print(f"{'page':<18}{'parser':<13}" + "".join(f"{column:>19}" for column in columns))
+    for name, scraper in PAGES.items():
+        body = load(name)
+        no_meta = _META_CHARSET.sub(b"", body)
+        backend, target, encoding = scraper.parser, TARGETS.get(name), scraper.encoding
+        cases = {
+            "detect": lambda: parse_html(body, backend, target),
+            "declared": lambda: parse_html(body, backend, target, encoding),
+            "no-meta": lambda: parse_html(no_meta, backend, target),
+            "dammit": lambda: UnicodeDammit(body, is_html=True),
+            "decode": lambda: body.decode(encoding),
+        }
+        if charset_normalizer is not None:
+            cases["charset_normalizer"] = lambda: charset_normalizer.from_bytes(body).best()
+        cells = [f"{median_ms(cases[column], args.runs):16.3f} ms" if column in cases else f"{'n/a':>19}" for column in columns]
+        print(f"{name:<18}{backend:<13}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares the declarative `LineSpec` extraction of general information
+against the hand-written `find`/`findAll` chains it replaced, on the saved
+pages, each parsed the way its scraper parses it.
+
+    python -m benchmarks.extraction
+    python -m benchmarks.extraction --runs 200
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.corpus import TARGETS, describe, load
+from scrapers.hungary_hu import HUNGARY_GENERAL, HungaryScraper
+from scrapers.moldova_ro import MOLDOVA_GENERAL, MoldovaScraper
+from scrapers.poland import POLAND_CORE, PolandScraper
+from scrapers.romaina_ro import ROMANIA_GENERAL, RomaniaScraper
+from utils.extraction import extract_lines
+from utils.parsing import parse_html
+
+
+def paragraphs(tag, class_):
+    """The chain the Hungary, Moldova and Romania scrapers used."""
+    def extract(content):
+        main_div = content.find(tag, class_=class_)
+        return [item.get_text(strip=True, separator=' ') for item in main_div.findAll('p')]
+    return extract
+
+
+def poland_core(locale):
+    """The chain `PolandScraper.get_core` used."""
+    def extract(content):
+        items = content.find('div', class_="editor-content").findAll("span" if locale == "en" else "li")
+        text_arr = []
+        for item in items:
+            if item.find(text="RECEPTION POINT ADDRESS"):
+                break
+            text_arr.append(item.get_text(strip=True, separator=' '))
+        return text_arr
+    return extract
+
+
+# Fixture -> (scraper, hand-written chain, spec).
+CASES = {
+    "hungary_hu.html": (HungaryScraper, paragraphs("div", "field-szovegtorzs oldal"), HUNGARY_GENERAL),
+    "moldova_ro.html": (MoldovaScraper, paragraphs("div", "col-lg-10 offset-lg-1"), MOLDOVA_GENERAL),
+    "romania_ro_info.html": (RomaniaScraper, paragraphs("div", "mrow txtcontent"), ROMANIA_GENERAL),
+    "poland_pl.html": (PolandScraper, poland_core("pl"), POLAND_CORE["pl"]),
+    "poland_en.html": (PolandScraper, poland_core("en"), POLAND_CORE["en"]),
+    "poland_ua.html": (PolandScraper, poland_core("ua"), POLAND_CORE["ua"]),
+}
+
+
+def median_ms(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    print(describe(CASES))
+    print(f"{'page':<22}{'lines':>6}{'find chain':>14}{'spec':>12}{'speedup':>9}")
+    for name, (scraper, chain, spec) in CASES.items():
+        content = parse_html(load(name), scraper.parser, TARGETS[name])
+        lines = extract_lines(spec, content)
+        if lines != chain(content):
+            raise AssertionError(f"{name}: the spec extracts different lines than the find chain")
+        old = median_ms(lambda: chain(content), args.runs)
+        new = median_ms(lambda: extract_lines(spec, content), args.runs)
+        print(f"{name:<22}{len(lines):>6}{old:>11.3f} ms{new:>9.3f} ms{old / new:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Reports the cold-start import cost of each module the Lambda loads.
+
+Every module is imported in a fresh interpreter with `-X importtime`, the
+same way a cold Lambda container would, and the cumulative time is the
+median over `--runs` interpreters.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save before.json
+    python -m benchmarks.import_time --compare before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULES = [
+    "lambda_function",
+    "utils.dynamo",
+    "utils.fetch",
+    "utils.utils",
+    "scrapers.poland",
+    "scrapers.hungary_hu",
+    "scrapers.moldova_ro",
+    "scrapers.romaina_ro",
+    "boto3",
+    "requests",
+    "bs4",
+    "utils.kml",
+]
+
+# Slowdown, relative to the compared run, that counts as a regression.
+REGRESSION_THRESHOLD = 1.2
+
+
+def import_time_us(module):
+    """Cumulative microseconds it takes to import `module` in a fresh interpreter."""
+    env = dict(os.environ)
+    # Mirror the Lambda, which puts ./deps in front of everything.
+    env["PYTHONPATH"] = os.pathsep.join([os.path.join(BASE_DIR, "deps"), BASE_DIR])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def measure(modules, runs):
+    return {module: statistics.median(import_time_us(module) for _ in range(runs)) for module in modules}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against results saved with --save")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    results = measure(args.modules, args.runs)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f"{'module':<24}{'ms':>10}{'before':>10}{'ratio':>8}")
+    for module, us in results.items():
+        line = f"{module:<24}{us / 1000:>10.1f}"
+        if module in baseline:
+            ratio = us / baseline[module]
+            line += f"{baseline[module] / 1000:>10.1f}{ratio:>8.2f}"
+            if ratio > REGRESSION_THRESHOLD:
+                regressions.append(module)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        sys.exit(f"Import time regressed for: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
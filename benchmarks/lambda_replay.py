@@ -0,0 +1,112 @@
+"""
+Benchmarks and load-tests the whole `lambda_handler` flow without the network.
+
+Responses come from cassettes (see `utils.transport`), with an artificial
+round-trip latency, and writes go to an in-memory `LocalDynamoClient`.
+Without `--cassettes`, cassettes are built from the fixtures, which are
+synthetic unless recorded, see `benchmarks.corpus`.
+`--concurrency` runs that many warm "containers" side by side, each in its
+own process; `--cold` turns off the warm cache they'd otherwise share
+between their invocations.
+
+    python -m benchmarks.lambda_replay --latency-ms 150
+    python -m benchmarks.lambda_replay --invocations 40 --concurrency 4
+    python -m benchmarks.lambda_replay --invocations 20 --cold
+    SCRAPER_TRANSPORT=record python main.py  # record real cassettes first
+    python -m benchmarks.lambda_replay --cassettes .cache/cassettes
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import utils.timing
+from benchmarks.corpus import FIXTURES, describe, load
+from utils.dynamo_local import LocalDynamoClient
+from utils.transport import ReplayTransport, set_transport, write_cassette
+
+
+def cassettes_from_fixtures(directory):
+    for name, url in FIXTURES.items():
+        content_type = "application/vnd.google-earth.kml+xml" if name.endswith(".kml") else "text/html; charset=utf-8"
+        write_cassette(directory, url, 200, {"Content-Type": content_type}, load(name))
+
+
+def invoke(cassettes, latency, invocations, event, cold=False):
+    """Runs `lambda_handler` `invocations` times in this process, returning each latency in seconds."""
+    import lambda_function
+
+    set_transport(ReplayTransport(cassettes, latency))
+    utils.timing.logger.disabled = True
+    latencies = []
+    with contextlib.ExitStack() as patches:
+        patches.enter_context(patch("utils.dynamo.client", LocalDynamoClient()))
+        patches.enter_context(patch("utils.fetch.cache", None))
+        if cold:
+            patches.enter_context(patch("utils.warm_cache.bodies", None))
+            patches.enter_context(patch("utils.warm_cache.results", None))
+        for _ in range(invocations):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                lambda_function.lambda_handler(event, None)
+                latencies.append(time.perf_counter() - start)
+            utils.timing.drain()
+    return latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassettes", help="directory of recorded cassettes (default: built from fixtures)")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="artificial latency per request")
+    parser.add_argument("--invocations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--country", help="scrape only this country code, like a single-country event")
+    parser.add_argument("--cold", action="store_true", help="don't reuse bodies and results between invocations")
+    args = parser.parse_args()
+
+    event = {"country": args.country} if args.country else {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cassettes = args.cassettes
+        if cassettes is None:
+            cassettes = tmp
+            cassettes_from_fixtures(cassettes)
+            print(describe())
+
+        per_worker = [args.invocations // args.concurrency] * args.concurrency
+        for i in range(args.invocations % args.concurrency):
+            per_worker[i] += 1
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [
+                pool.submit(invoke, cassettes, args.latency_ms / 1000, count, event, args.cold)
+                for count in per_worker if count
+            ]
+            latencies = [latency for future in futures for latency in future.result()]
+        wall = time.perf_counter() - start
+
+    print(
+        f"{len(latencies)} invocations, concurrency {args.concurrency}, {args.latency_ms:.0f} ms per request"
+        + (", cold" if args.cold else "")
+    )
+    print(f"wall {wall:.2f}s, {len(latencies) / wall:.2f} invocations/s")
+    print(
+        f"latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p90 {percentile(latencies, 0.9) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+        f"max {max(latencies) * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares the HTML parser backends on the saved source pages.
+
+For every fixture and backend, reports the median parse time and, measured
+in a fresh child process, the peak Python heap allocated while parsing
+(tracemalloc) and the resident memory the finished tree holds on to.  The
+latter also covers lxml's C allocations, which tracemalloc can't see.
+
+BeautifulSoup backends are measured twice: on the whole page, and again
+(`+target`) only building the container the scraper declares.
+
+    python -m benchmarks.parsers
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.corpus import PAGES, TARGETS, describe, load
+from utils.parsing import LXML_DIRECT, PARSERS, parse_html
+
+
+def parse_time_ms(content, parser, target, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse_html(content, parser, target)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _rss_kb():
+    # Linux only; elsewhere the resident size column reads 0.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return 0
+
+
+def _memory_kb(name, parser, target):
+    content = load(name)
+    parse_html(b"<html></html>", parser)  # Import the backend before measuring.
+    rss_before = _rss_kb()
+    tracemalloc.start()
+    tree = parse_html(content, parser, target)
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_growth = _rss_kb() - rss_before
+    del tree
+    return heap_peak // 1024, rss_growth
+
+
+def memory_kb(name, parser, target):
+    """Peak Python heap and resident growth, in KiB, of parsing the fixture in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_memory_kb, (name, parser, target))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--parsers", nargs="*", default=list(PARSERS))
+    args = parser.parse_args()
+
+    print(describe(PAGES))
+    print(f"{'fixture':<24}{'parser':<20}{'KiB':>8}{'ms':>10}{'heap KiB':>10}{'rss KiB':>10}")
+    for name in PAGES:
+        content = load(name)
+        for backend in args.parsers:
+            targets = [None] if backend == LXML_DIRECT else [None, TARGETS[name]]
+            for target in targets:
+                ms = parse_time_ms(content, backend, target, args.runs)
+                heap, rss = memory_kb(name, backend, target)
+                label = backend + ("+target" if target else "")
+                print(f"{name:<24}{label:<20}{len(content) / 1024:>8.0f}{ms:>10.2f}{heap:>10}{rss:>10}")
+
+
+if __name__ == "__main__":
+    main()
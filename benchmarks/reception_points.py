@@ -0,0 +1,100 @@
+"""
+Times the Poland reception-point extraction on pages with more and more
+points, against the loop it replaced, to check it stays linear.
+
+The pages follow the English page's layout: general paragraphs, the
+reception heading, then alternating address and QR paragraphs.
+
+    python -m benchmarks.reception_points
+    python -m benchmarks.reception_points --points 10 100 1000 --runs 20
+"""
+
+import argparse
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+
+from scrapers.poland import RECEPTION_END, RECEPTION_HEADING, read_reception_points
+from utils.coordinates import extract as extract_coordinates
+from utils.reception import Reception
+from utils.utils import normalize
+
+
+def page(points):
+    """An editor-content block with `points` reception points."""
+    paragraphs = [f"<p><span>General information, paragraph {i}.</span></p>" for i in range(12)]
+    paragraphs.append(f"<p><span><strong>{RECEPTION_HEADING}</strong></span></p>")
+    for i in range(points):
+        lat, lon = 50 + i / 10000, 23 + i / 10000
+        href = f"https://www.google.pl/maps/place/P{i}/@{lat},{lon},17z/data=!3m1!4b1!8m2!3d{lat}!4d{lon}"
+        paragraphs.append(f'<p><u><a href="{href}">Centrum nr {i}, ul. Graniczna {i}</a></u></p>')
+        paragraphs.append(f'<p><img src="https://www.qr-online.pl/bin/qr/{i}.png" width="110"/></p>')
+    paragraphs.append(f"<p><span><strong>{RECEPTION_END}</strong></span></p>")
+    paragraphs.extend(f"<p>Afterwards, paragraph {i}.</p>" for i in range(6))
+    markup = f'<div class="editor-content"><div>{"".join(paragraphs)}</div></div>'
+    return BeautifulSoup(markup, "html.parser").find("div", class_="editor-content")
+
+
+def find_loop(block):
+    """The loop `PolandScraper.get_reception_points_en` used."""
+    recep_arr = []
+    started = False
+    count = 0
+    for item in block.find('div').findChildren(recursive=False):
+        if item.find(text=RECEPTION_HEADING):
+            started = True
+            continue
+        if item.find(text=RECEPTION_END):
+            break
+        if not started:
+            continue
+        count += 1
+        r = Reception()
+        r.address = r.name = normalize(item.get_text(strip=True, separator=' '))
+        gmaps = item.find('a', href=True)
+        if gmaps:
+            coordinates = extract_coordinates(gmaps['href'])
+            if coordinates is None:
+                break
+            r.lat, r.lon = coordinates
+        img = item.find('img', src=True)
+        if count == 1:
+            if img:
+                r.qr = img['src']
+            recep_arr.append(r)
+        elif count % 2 == 0:
+            recep_arr.append(r)
+        elif img:
+            recep_arr[-1].qr = img['src']
+    return recep_arr
+
+
+def median_ms(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'points':>7}{'find loop':>13}{'state machine':>16}{'per point':>12}")
+    for points in args.points:
+        block = page(points)
+        found = read_reception_points(block)
+        if len(found) != points or not all(r.qr for r in found):
+            raise AssertionError(f"{points} points: expected every point with its QR code")
+        old = median_ms(lambda: find_loop(block), args.runs)
+        new = median_ms(lambda: read_reception_points(block), args.runs)
+        print(f"{points:>7}{old:>10.3f} ms{new:>13.3f} ms{new / points * 1000:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Runs every scraper end to end against the saved fixtures, which are
+synthetic unless recorded, see `benchmarks.corpus`.
+
+Fetches are served from the fixtures through the prefetch
+mechanism and writes go to an in-memory `LocalDynamoClient`, so nothing
+touches the network and runs are repeatable.  For each scraper, reports
+throughput, latency percentiles and the peak Python heap of one run.
+
+    python -m benchmarks.scrapers
+    python -m benchmarks.scrapers --save before.json
+    python -m benchmarks.scrapers --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import utils.dynamo
+import utils.timing
+from benchmarks.corpus import FIXTURES, describe, load_url
+from scrapers.registry import SCRAPERS, get_scraper
+from utils.dynamo_local import LocalDynamoClient
+from utils.fetch import FetchResult, seed_prefetched
+
+# Slowdown of the median latency, relative to the compared run, that counts as a regression.
+REGRESSION_THRESHOLD = 1.2
+
+# Scrapers with a full set of fixtures.  Slovakia reads a local working copy.
+BENCHMARKED = [name for name in SCRAPERS if name != "slovakia"]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_once(name, bodies):
+    """Scrapes `name` once from `bodies`, returning the seconds it took."""
+    seed_prefetched({url: FetchResult(url, body) for url, body in bodies.items()})
+    utils.dynamo._last_hashes.clear()
+    start = time.perf_counter()
+    get_scraper(name).scrape("")
+    seconds = time.perf_counter() - start
+    utils.timing.drain()
+    return seconds
+
+
+def benchmark(name, runs, warmup):
+    scraper = get_scraper(name)
+    bodies = {url: load_url(url) for url in scraper.urls}
+    client = LocalDynamoClient()
+    # Without the warm cache, which would serve every run after the first
+    # from memory instead of parsing and extracting.
+    with patch("utils.dynamo.client", client), patch("utils.fetch.cache", None), \
+            patch("utils.warm_cache.bodies", None), patch("utils.warm_cache.results", None):
+        for _ in range(warmup):
+            run_once(name, bodies)
+        latencies = [run_once(name, bodies) for _ in range(runs)]
+
+        tracemalloc.start()
+        run_once(name, bodies)
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    total_bytes = sum(len(body) for body in bodies.values())
+    return {
+        "runs": runs,
+        "runs_per_second": runs / sum(latencies),
+        "mb_per_second": total_bytes * runs / sum(latencies) / 1e6,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p90_ms": percentile(latencies, 0.9) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_heap_kb": heap_peak // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against results saved with --save")
+    parser.add_argument("scrapers", nargs="*", default=BENCHMARKED)
+    args = parser.parse_args()
+
+    utils.timing.logger.disabled = True
+    results = {}
+    for name in args.scrapers:
+        # The scrapers print progress on every run.
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = benchmark(name, args.runs, args.warmup)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(describe(FIXTURES))
+    print(f"{'scraper':<10}{'runs/s':>9}{'MB/s':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'heap KiB':>10}{'vs p50':>8}")
+    for name, r in results.items():
+        line = (
+            f"{name:<10}{r['runs_per_second']:>9.1f}{r['mb_per_second']:>8.2f}"
+            f"{r['p50_ms']:>9.2f}{r['p90_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['peak_heap_kb']:>10}"
+        )
+        if name in baseline:
+            ratio = r["p50_ms"] / baseline[name]["p50_ms"]
+            line += f"{ratio:>8.2f}"
+            if ratio > REGRESSION_THRESHOLD:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        sys.exit(f"Median latency regressed for: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
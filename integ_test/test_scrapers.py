@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 import utils.dynamo
+import utils.fetch
 from scrapers.hungary_hu import HungaryScraper
 from scrapers.moldova_ro import MoldovaScraper
 from scrapers.poland import PolandScraper
@@ -11,8 +12,14 @@ from scrapers.slovakia_sk import SlovakiaScraper
 @pytest.fixture(autouse=True)
 def put_item():
     """Mock dynamo.  Stupid dynamo."""
-    with patch('utils.dynamo.client.put_item', MagicMock(name='put_item')) as put_item:
-        yield put_item
+    with patch('utils.dynamo.client', MagicMock(name='client')) as client:
+        yield client.put_item
+
+@pytest.fixture(autouse=True)
+def no_fetch_cache():
+    """Always scrape for real, even if a previous run cached the pages."""
+    with patch('utils.fetch.cache', None):
+        yield
 
 @pytest.fixture()
 def check_common(put_item):
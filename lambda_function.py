@@ -4,41 +4,22 @@ import sys
 sys.path.insert(0, "./deps")
 
 # Additional imports
-from scrapers.poland import PolandScraper
-from scrapers.moldova_ro import MoldovaScraper
-from scrapers.hungary_hu import HungaryScraper
-from scrapers.romaina_ro import RomaniaScraper
+from scrapers.registry import COUNTRIES, run
+from utils.policy import deadline_from
 
-poland_scraper = PolandScraper()
-hungary_scraper = HungaryScraper()
-moldova_scraper = MoldovaScraper()
-romania_scraper = RomaniaScraper()
 
 def lambda_handler(event, context):
-    """Call all scrapers."""
+    """Call all scrapers, or only the one for `event["country"]`."""
 
-    if 'country' in event:
-        country = event["country"]
-        if country == "poland-en":
-            poland_scraper.scrape_poland_en(event)
-        elif country == "poland-pl":
-            poland_scraper.scrape_poland_pl(event)
-        elif country == "poland-ua":
-            poland_scraper.scrape_poland_ua(event)
-        elif country == "hungary-hu":
-            hungary_scraper.scrape(event)
-        elif country == "moldova-ro":
-            moldova_scraper.scrape(event)
-        elif country == "romania-ro":
-            romania_scraper.scrape(event)
-    else:
-        for scraper in [
-            poland_scraper,
-            hungary_scraper,
-            moldova_scraper,
-            romania_scraper
-        ]:
-            try:
-                scraper.scrape(event)
-            except Exception:
-                logging.exception('An error was encountered during scraping.')
+    # Fetches give up in time for the results to be written.
+    with deadline_from(context):
+        if 'country' in event:
+            country = event["country"]
+            if country not in COUNTRIES:
+                logging.warning('Unknown country %r, nothing to scrape.', country)
+                return
+            errors = run([country], event)
+            if errors:
+                raise next(iter(errors.values()))
+        else:
+            run(event=event)
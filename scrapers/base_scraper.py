@@ -1,7 +1,62 @@
 from abc import ABC, abstractmethod
 
+from utils.dynamo import destination
+from utils.fetch import fetch_chunks, unchanged, versions
+from utils.kml import read_reception_points
+from utils.parsing import DEFAULT_PARSER
+from utils.reception import Receptions
+from utils.timing import excluding, stage
+
 class BaseScraper(ABC):
 
+    # Every URL a full `scrape` downloads, so they can be prefetched together.
+    urls = ()
+
+    # The ones of `urls` read with `fetch_chunks` as they come in, like KML
+    # files, which aren't prefetched so they don't arrive whole.
+    streamed = ()
+
+    # Method scraping a single country -> the URLs it downloads, as `urls`
+    # are for `scrape`.
+    method_urls = {}
+
+    # HTML parser backend for this scraper's pages, see `utils.parsing`.
+    parser = DEFAULT_PARSER
+
+    # Character encoding this scraper's pages are served in, so it isn't
+    # detected on every run.  None leaves it to the parser.
+    encoding = None
+
     @abstractmethod
     def scrape(self):
-        pass
\ No newline at end of file
+        pass
+
+    def urls_of(self, method):
+        """The URLs `method` downloads."""
+        return self.urls if method == "scrape" else self.method_urls.get(method, ())
+
+    def _unchanged(self, event, country, *urls):
+        """
+        True if no source changed since `country`'s item was last written
+        for this `event`, unless the event sets `force`.
+        """
+        if isinstance(event, dict) and event.get("force"):
+            return False
+        return unchanged(urls, destination(country, event), streamed=self.streamed)
+
+    def _read_map(self, url, **filters):
+        """
+        Reads the reception points of the KML map at `url` as it streams in,
+        see `utils.kml.read_reception_points` for the `filters`.
+
+        Logged as an `extract` stage without the download, which is the
+        fetch stage's.
+        """
+        with stage("extract", url=url) as record:
+            reception_arr = Receptions(read_reception_points(excluding(fetch_chunks(url), record), **filters))
+            record["items"] = len(reception_arr)
+        return reception_arr
+
+    def _sources(self, *urls):
+        """The versions of `urls` to pass to `write_to_dynamo`, so unchanged later runs can skip."""
+        return versions(urls)
@@ -1,46 +1,51 @@
-import requests
-import xmltodict
-
 from scrapers.base_scraper import BaseScraper
 
-from utils.constants import HEADERS
-from utils.dynamo import write_to_dynamo
-from utils.utils import get_reception_points, get_website_content, normalize
+from utils.extraction import LineSpec, extract_lines
+from utils.parsing import LXML
+from utils.dynamo import touch, write_to_dynamo
+from utils.utils import extract_website, normalize_all
+from utils.timing import timed
 
 HUNGARY_URL = "https://www.police.hu/hu/hirek-es-informaciok/hatarinfo/hataratlepessel-kapcsolatos-informaciok"
+# The only part of the page `_get_general` looks at.
+HUNGARY_TARGET = ("div", "field-szovegtorzs oldal")
+# The general information: every paragraph in that part.
+HUNGARY_GENERAL = LineSpec("div.field-szovegtorzs.oldal", "p")
 HUNGARY_KML = "http://www.google.com/maps/d/kml?forcekml=1&mid=1d54nWG4ig0rmBPj3K3RF3I1mkY0KOFZd"
 
 
 class HungaryScraper(BaseScraper):
 
+    urls = (HUNGARY_URL, HUNGARY_KML)
+    streamed = (HUNGARY_KML,)
+    parser = LXML
+    encoding = "utf-8"
+
     def scrape(self, event = ""):
         print("Scraping Hungary (HU)")
+        if self._unchanged(event, "hungary-hu", HUNGARY_URL, HUNGARY_KML):
+            print("Hungary (HU) is unchanged, skipping")
+            touch("hungary-hu", event)
+            return
 
         """Start with general border info"""
-        content = get_website_content(HUNGARY_URL)
-        general = self._get_general(content)
+        general = extract_website(HUNGARY_URL, self._get_general, parser=self.parser, target=HUNGARY_TARGET, encoding=self.encoding)
 
         """Get border crossing points"""
         reception_arr = self._get_reception_points()
-        write_to_dynamo("hungary-hu", event, general, reception_arr, HUNGARY_URL)
+        write_to_dynamo("hungary-hu", event, general, reception_arr, HUNGARY_URL, self._sources(HUNGARY_URL, HUNGARY_KML))
 
 
+    @timed("extract")
     def _get_general(self, content):
         """Gets general border crossing information."""
-        main_div = content.find('div', class_="field-szovegtorzs oldal")
-        items = main_div.findAll('p')
-        text_arr = []
-        for item in items:
-            text_arr.append(normalize(item.get_text(strip=True, separator=' ')))
-        return text_arr
+        return normalize_all(extract_lines(HUNGARY_GENERAL, content))
 
 
     def _get_reception_points(self):
         """Get map KML"""
-        kml_str = requests.get(HUNGARY_KML, headers=HEADERS).content
-        kml = xmltodict.parse(kml_str, dict_constructor=dict)
-        return get_reception_points(
-            kml=kml,
+        return self._read_map(
+            HUNGARY_KML,
             folder_name_whitelist=["Border crossing point"],
             style_urls_blacklist=["#icon-1581-E65100", "#icon-1581-F57C00-nodesc"],
         )
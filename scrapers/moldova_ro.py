@@ -1,39 +1,45 @@
-import requests
-import xmltodict
 from scrapers.base_scraper import BaseScraper
-from utils.dynamo import write_to_dynamo
-from utils.constants import HEADERS
-from utils.utils import get_reception_points, get_website_content, normalize
+from utils.dynamo import touch, write_to_dynamo
+from utils.extraction import LineSpec, extract_lines
+from utils.parsing import LXML
+from utils.utils import extract_website, normalize_all
+from utils.timing import timed
 
 MOLDOVA_UKRAINE_URL = "https://www.border.gov.md/ro/ucraina"
+# The only part of the page `get_general` looks at.
+MOLDOVA_TARGET = ("div", "col-lg-10 offset-lg-1")
+# The general information: every paragraph in that part.
+MOLDOVA_GENERAL = LineSpec("div.col-lg-10.offset-lg-1", "p")
 MOLDOVA_KML = "http://www.google.com/maps/d/kml?forcekml=1&mid=1S38hHlp67u7UoFgVGFC-GCU2Efsn6WeC"
 
 class MoldovaScraper(BaseScraper):
 
+  urls = (MOLDOVA_UKRAINE_URL, MOLDOVA_KML)
+  streamed = (MOLDOVA_KML,)
+  parser = LXML
+  encoding = "utf-8"
+
   def scrape(self, event = ""):
     print("Scraping Moldova (RO)")
+    if self._unchanged(event, "moldova-ro", MOLDOVA_UKRAINE_URL, MOLDOVA_KML):
+      print("Moldova (RO) is unchanged, skipping")
+      touch("moldova-ro", event)
+      return
 
     """Start with general border info"""
-    content = get_website_content(MOLDOVA_UKRAINE_URL)
-    general = self.get_general(content)
+    general = extract_website(MOLDOVA_UKRAINE_URL, self.get_general, parser=self.parser, target=MOLDOVA_TARGET, encoding=self.encoding)
 
     """Get border crossing points"""
     reception_arr = self._get_reception_points()
-    write_to_dynamo("moldova-ro", event, general, reception_arr, MOLDOVA_UKRAINE_URL)
+    write_to_dynamo("moldova-ro", event, general, reception_arr, MOLDOVA_UKRAINE_URL, self._sources(MOLDOVA_UKRAINE_URL, MOLDOVA_KML))
 
+  @timed("extract")
   def get_general(self, content):
     """Gets general border crossing information."""
-    main_div = content.find('div', class_="col-lg-10 offset-lg-1")
-    items = main_div.findAll('p')
-    text_arr = []
-    for item in items:
-      text_arr.append(normalize(item.get_text(strip=True, separator=' ')))
-    return text_arr
+    return normalize_all(extract_lines(MOLDOVA_GENERAL, content))
 
   def _get_reception_points(self):
     """Gets the list of reception points."""
 
     """Get map KML"""
-    kml_str = requests.get(MOLDOVA_KML, headers=HEADERS).content
-    kml = xmltodict.parse(kml_str, dict_constructor=dict)
-    return get_reception_points(kml=kml)
+    return self._read_map(MOLDOVA_KML)
@@ -1,18 +1,90 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4.element import CData, NavigableString, Tag
+
 from scrapers.base_scraper import BaseScraper
+from utils.coordinates import extract_pin
+from utils.extraction import LineSpec, extract_lines
 from utils.reception import Reception
-from utils.utils import get_website_content, gmaps_url_to_lat_lon, normalize
-from utils.dynamo import write_to_dynamo
+from utils.utils import extract_website, normalize, normalize_all
+from utils.dynamo import batch_writes, touch, write_to_dynamo
+from utils.timing import timed
 
 POLAND_EN_URL = 'https://www.gov.pl/web/udsc/ukraina-en'
 POLAND_PL_URL = 'https://www.gov.pl/web/udsc/ukraina2'
 POLAND_UA_URL = 'https://www.gov.pl/web/udsc/ukraina---ua'
 
+# Locale -> the page it's scraped from.
+POLAND_LOCALES = {
+    'pl': POLAND_PL_URL,
+    'en': POLAND_EN_URL,
+    'ua': POLAND_UA_URL,
+}
+
+# The block holding both the general information and the reception points.
+POLAND_TARGET = ("div", "editor-content")
+
+# Headings around the English page's list of reception points.
+RECEPTION_HEADING = "RECEPTION POINT ADDRESS"
+RECEPTION_END = "What next?"
+
+# Locale -> the general information in that block, up to the reception points.
+_POLAND_EN_CORE = LineSpec("div.editor-content", "span", stop_text=RECEPTION_HEADING)
+_POLAND_LIST_CORE = LineSpec("div.editor-content", "li", stop_text=RECEPTION_HEADING)
+POLAND_CORE = {
+    'pl': _POLAND_LIST_CORE,
+    'en': _POLAND_EN_CORE,
+    'ua': _POLAND_LIST_CORE,
+}
+
+# The strings `get_text` counts as text, leaving out comments and the like.
+_TEXT_TYPES = (NavigableString, CData)
+
 class PolandScraper(BaseScraper):
 
+    urls = (POLAND_PL_URL, POLAND_EN_URL, POLAND_UA_URL)
+    method_urls = {
+        'scrape_poland_pl': (POLAND_PL_URL,),
+        'scrape_poland_en': (POLAND_EN_URL,),
+        'scrape_poland_ua': (POLAND_UA_URL,),
+    }
+    encoding = "utf-8"
+
     def scrape(self, event = ""):
-        self.scrape_poland_pl(event)
-        self.scrape_poland_en(event)
-        self.scrape_poland_ua(event)
+        """
+        Scrapes all locales concurrently, then writes them together.
+
+        A locale failing doesn't keep the others from being written, and
+        the first failure is raised once they are.
+        """
+        print("Scraping Poland (PL, EN, UA)")
+
+        # Each worker fetches, parses and extracts one locale, so one page's
+        # download overlaps with another's parsing.
+        with ThreadPoolExecutor(max_workers=len(POLAND_LOCALES)) as pool:
+            futures = {
+                locale: pool.submit(self.extract_poland, url, locale, event)
+                for locale, url in POLAND_LOCALES.items()
+            }
+        results = {}
+        errors = []
+        for locale, future in futures.items():
+            try:
+                results[locale] = future.result()
+            except Exception as e:
+                logging.exception('An error was encountered while scraping Poland (%s).', locale.upper())
+                errors.append(e)
+
+        with batch_writes():
+            for locale, result in results.items():
+                if result is None:
+                    touch("poland-" + locale, event)
+                else:
+                    general, reception_arr = result
+                    write_to_dynamo("poland-" + locale, event, general, reception_arr, POLAND_PL_URL, self._sources(POLAND_LOCALES[locale]))
+        if errors:
+            raise errors[0]
 
     def scrape_poland_pl(self, event = ""):
         print("Scraping Poland (PL)")
@@ -33,133 +105,134 @@ class PolandScraper(BaseScraper):
         """calls scrape_poland with the appropriate arguments for the ua website"""
         self.scrape_poland(POLAND_UA_URL, 'ua', event)
 
+    @timed("extract")
     def get_core(self, content, locale):
         """Gets the content from a bullet points list of general information for Ukrainian citizens."""
-        items = content.find('div', class_="editor-content").findAll("span" if locale == "en" else "li")
-        text_arr = []
-        for item in items:
-            if item.find(text="RECEPTION POINT ADDRESS"):
-                break
-            text_arr.append(normalize(item.get_text(strip=True, separator=' ')))
-        return text_arr
-
-    def scrape_poland(self, url, locale, event):
-        """Runs the scraping logic."""
-        content = get_website_content(url)
-        general = self.get_core(content, locale)
-        if locale in ("pl", "ua"): #poland_ua uses same logic as poland_pl
-            reception_arr = self.get_reception_points_pl(content)
-        elif locale == "en":
-            reception_arr = self.get_reception_points_en(content)
-
-        #path = os.path.join(OUTPUT_DIR, f'poland_{locale}.json')
-        country = "poland-" + locale
-        write_to_dynamo(country, event, general, reception_arr, POLAND_PL_URL)
+        return normalize_all(extract_lines(POLAND_CORE[locale], content))
 
-    def get_reception_points_en(self, soup):
-        """Gets the list of reception points."""
-        items = soup.find('div', class_="editor-content").find('div').findChildren(recursive=False)
-        reception_list_start = False
-        recep_arr = []
-        count = 0
-
-        for item in items:
-            # start scraping for reception points after the title
-            if item.find(text="RECEPTION POINT ADDRESS"):
-                reception_list_start = True
-                continue
-            # stop scraping after "what's next?"
-            if item.find(text="What next?"):
-                break
+    def extract_poland(self, url, locale, event):
+        """
+        Fetches and extracts one locale's page.
 
-            if not reception_list_start:
-                continue
+        Returns:
+            tuple: The general lines and the reception points, or None if
+            the page didn't change.
+        """
+        if self._unchanged(event, "poland-" + locale, url):
+            print(f"Poland ({locale.upper()}) is unchanged, skipping")
+            return None
 
-            count += 1
-            r = Reception()
-            r.address = r.name = normalize(item.get_text(strip=True, separator=' '))
-            gmaps = item.find('a', href=True)
+        def extract(content):
+            general = self.get_core(content, locale)
+            if locale in ("pl", "ua"): #poland_ua uses same logic as poland_pl
+                reception_arr = self.get_reception_points_pl(content)
+            elif locale == "en":
+                reception_arr = self.get_reception_points_en(content)
+            return general, reception_arr
 
-            if gmaps:
-                if "!3d" in gmaps['href']:
-                    r.lat, r.lon = gmaps_url_to_lat_lon(gmaps['href'])
-                else:
-                    break
+        return extract_website(url, extract, parser=self.parser, target=POLAND_TARGET, encoding=self.encoding)
 
-            img = item.find('img', src=True)
-
-            # first item is special because the qr and address are in the same <p> tag
-            if count == 1:
-                if img:
-                    r.qr = img['src']
-                recep_arr.append(r)
-                continue
+    def scrape_poland(self, url, locale, event):
+        """Runs the scraping logic."""
+        result = self.extract_poland(url, locale, event)
+        country = "poland-" + locale
+        if result is None:
+            touch(country, event)
+            return
+        general, reception_arr = result
 
-            # normal items: qr and address are in separate <p> tags
-            if count % 2 == 0:
-                recep_arr.append(r)
-            else:
-                # Get from the end of array,
-                img = item.find('img', src=True)
-                if img:
-                    recep_arr[-1].qr = img['src']
+        #path = os.path.join(OUTPUT_DIR, f'poland_{locale}.json')
+        write_to_dynamo(country, event, general, reception_arr, POLAND_PL_URL, self._sources(url))
 
-        return recep_arr
+    @timed("extract")
+    def get_reception_points_en(self, soup):
+        """Gets the list of reception points, each named by its whole paragraph."""
+        return read_reception_points(soup.find('div', class_="editor-content"))
 
+    @timed("extract")
     def get_reception_points_pl(self, soup):
-        """Gets the list of reception points."""
-        item = soup.find('div', class_="editor-content").findAll('p')
-        item = item[4:] #this number is likely to change (I think)
-                        # TODO detect it automatically
+        """Gets the list of reception points, each named by the first span of its link."""
+        return read_reception_points(soup.find('div', class_="editor-content"), link_names=True)
+
+
+def _scan(paragraph):
+    """Returns a paragraph's stripped strings, first link and first image, in one walk of it."""
+    strings = []
+    link = img = None
+    for node in paragraph.descendants:
+        if isinstance(node, Tag):
+            if link is None and node.name == 'a' and node.get('href'):
+                link = node
+            elif img is None and node.name == 'img' and node.get('src'):
+                img = node
+        elif type(node) in _TEXT_TYPES:
+            text = node.strip()
+            if text:
+                strings.append(text)
+    return strings, link, img
+
+
+def read_reception_points(block, link_names=False):
+    """
+    Reads the reception points out of a page's editor-content `block`, in
+    one pass over its paragraphs.
+
+    The list starts at the `RECEPTION_HEADING`, or else at the first
+    paragraph linking to a place on a map (a link with a `!3d...!4d...`
+    pin, see `extract_pin`), and ends at `RECEPTION_END` or at the first
+    link that isn't to a place, even one holding other coordinates.
+
+    Each paragraph with a place link is a point.  Its QR code is an image in
+    the same paragraph, or else the image of the next paragraph if that one
+    holds only an image, no visible text.  Empty paragraphs are skipped, so
+    they don't come between a point and its QR code.
+
+    Args:
+        block (Tag): The editor-content block.
+        link_names (bool): Name points by the first span of their link (or
+            the link's text) rather than by the whole paragraph.
+    """
+    recep_arr = []
+    in_list = False
+    # Whether the last point has no QR code yet, and this paragraph may hold it.
+    awaiting_qr = False
+    for paragraph in block.find_all('p'):
+        strings, link, img = _scan(paragraph)
+        # Pages leave zero-width spaces around: they don't count as text.
+        text = normalize(' '.join(strings))
+        if not text and link is None and img is None:
+            continue
+        qr_due, awaiting_qr = awaiting_qr, False
+        if RECEPTION_END in strings:
+            if in_list:
+                break
+            continue
+        if RECEPTION_HEADING in strings:
+            in_list = True
+            continue
+
+        coordinates = extract_pin(link['href'], text=True) if link is not None else None
+        if coordinates is None:
+            if link is not None and in_list:
+                # The list ends at the first link that isn't to a place.
+                break
+            if qr_due and img is not None and not text:
+                recep_arr[-1].qr = img['src']
+            continue
+        in_list = True
 
-        recep_arr = []
-        """
-        First one looks like this
-        
-        <p><span style="font-size:11pt"><u><span style="font-size:10.5pt"><span style="color:blue"><a href="https://www.google.pl/maps/place/Gminny+Ośrodek+Kultury+i+Turystyki/@51.1653246,23.8026394,17z/data=!3m1!4b1!4m5!3m4!1s0x4723890b09b9cd4d:0x5747c0a6dfbbb992!8m2!3d51.1653213!4d23.8048281"><span style="color:blue">Pałac Suchodolskich Gminny Ośrodek Kultury i Turystyki, ul. Parkowa 5, 22-175 </span><strong>Dorohusk – osiedle</strong></a></span></span></u><br>
-    <img alt="https://www.qr-online.pl/bin/qr/8caf19812112ea544f35e994cd58573c.png" height="102" src="https://www.qr-online.pl/bin/qr/8caf19812112ea544f35e994cd58573c.png" width="102"/> ​</br></span></p>
-        
-        Rest of the things look like this
-        
-        <p><span style="font-size:11pt"><u><span style="color:blue"><a href="https://www.google.pl/maps/place/Sp%C3%B3%C5%82dzielcza+8,+22-540+Do%C5%82hobycz%C3%B3w/@50.5879307,24.0283211,17z/data=!3m1!4b1!4m5!3m4!1s0x4724ebc1d634e40b:0xd5f90534ea38bc2!8m2!3d50.5879273!4d24.0305098"><span style="color:blue">Przygraniczne Centrum Kultury i Rekreacji, ul. Spółdzielcza 8, 22 - 540 </span><strong>Dołhobyczów</strong></a></span></u></span></p>
-    =====
-    <p><span style="font-size:11pt"><img alt="https://www.qr-online.pl/bin/qr/7608a0a9319f79f95fb5346d5f6e3466.png" height="110" src="https://www.qr-online.pl/bin/qr/7608a0a9319f79f95fb5346d5f6e3466.png" width="110"/> ​</span></p>
-    
-        Temporarily hardcoding for the first one
-    
-        """
-        special_case = item[0]
         r = Reception()
-        r.address = normalize(special_case.get_text(strip=True, separator=' '))
-        gmaps = special_case.find('a', href=True)
-
-        if gmaps:
-            r.name = normalize(gmaps.find('span').get_text(strip=True))
-            r.lat, r.lon = gmaps_url_to_lat_lon(gmaps['href'])
-
-        img = special_case.find('img', src=True)
-        if img:
+        r.address = text
+        if link_names:
+            span = link.find('span')
+            r.name = normalize((span or link).get_text(strip=True))
+        else:
+            r.name = r.address
+        r.lat, r.lon = coordinates
+        if img is not None:
             r.qr = img['src']
+        else:
+            awaiting_qr = True
         recep_arr.append(r)
-        item.pop(0)
-        # TODO: Remove the entire above block if and when they fix the formatting on the site.
-
-        for count, i in enumerate(item):
-            if count % 2 == 0:
-                r = Reception()
-                r.address = normalize(i.get_text(strip=True, separator=' '))
-                gmaps = i.find('a', href=True)
-                if gmaps:
-                    if "!3d" in gmaps['href']:
-                        r.name = normalize(gmaps.find('span').get_text(strip=True))
-                        r.lat, r.lon = gmaps_url_to_lat_lon(gmaps['href'])
-                    else:
-                        break
-                    recep_arr.append(r)
-            else:
-                # Get from the end of array,
-                img = i.find('img', src=True)
-                if img:
-                    recep_arr[-1].qr = img['src']
-
-        return recep_arr
+
+    return recep_arr
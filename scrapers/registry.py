@@ -0,0 +1,135 @@
+"""
+Scrapers by country code, and the dispatcher every entry point runs them with.
+
+Scraper modules are only imported once a run needs them, so scraping a
+single country only loads that scraper and its dependencies.
+"""
+
+import importlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from utils.dynamo import batch_writes
+from utils.fetch import prefetch
+from utils import warm_cache
+from utils.timing import log_summary
+
+# Scraper name -> (module, class).
+SCRAPERS = {
+    "poland": ("scrapers.poland", "PolandScraper"),
+    "hungary": ("scrapers.hungary_hu", "HungaryScraper"),
+    "moldova": ("scrapers.moldova_ro", "MoldovaScraper"),
+    "romania": ("scrapers.romaina_ro", "RomaniaScraper"),
+    "slovakia": ("scrapers.slovakia_sk", "SlovakiaScraper"),
+}
+
+# Country code -> (scraper name, method that scrapes only that country).
+COUNTRIES = {
+    "poland-pl": ("poland", "scrape_poland_pl"),
+    "poland-en": ("poland", "scrape_poland_en"),
+    "poland-ua": ("poland", "scrape_poland_ua"),
+    "hungary-hu": ("hungary", "scrape"),
+    "moldova-ro": ("moldova", "scrape"),
+    "romania-ro": ("romania", "scrape"),
+    "slovakia-sk": ("slovakia", "scrape"),
+}
+
+# What a run without explicit countries scrapes.  Slovakia is still being
+# developed against a local copy of its website.
+DEFAULT_COUNTRIES = [country for country in COUNTRIES if country != "slovakia-sk"]
+
+# Scraper instances, kept across warm Lambda invocations.
+_scrapers = {}
+
+
+def get_scraper(name):
+    """Returns the scraper called `name`, importing its module on first use."""
+    if name not in _scrapers:
+        module_name, class_name = SCRAPERS[name]
+        module = importlib.import_module(module_name)
+        _scrapers[name] = getattr(module, class_name)()
+    return _scrapers[name]
+
+
+def plan(countries=None):
+    """
+    Turns country codes into the list of `(scraper name, method)` calls that scrape them.
+
+    When every country of a scraper is requested, its `scrape` runs once
+    for all of them instead of once per country.
+    """
+    if countries is None:
+        countries = DEFAULT_COUNTRIES
+    unknown = [country for country in countries if country not in COUNTRIES]
+    if unknown:
+        raise ValueError(f"Unknown countries: {', '.join(unknown)}")
+
+    tasks = []
+    for name in SCRAPERS:
+        own = [country for country in COUNTRIES if COUNTRIES[country][0] == name]
+        wanted = [country for country in own if country in countries]
+        if not wanted:
+            continue
+        if len(own) > 1 and len(wanted) == len(own):
+            tasks.append((name, "scrape"))
+        else:
+            tasks.extend(COUNTRIES[country] for country in wanted)
+    return tasks
+
+
+def _fetching(event):
+    """
+    The context to fetch in for `event`: a forced scrape is after the
+    current pages, not ones from a few minutes ago, see `warm_cache.fresh`.
+    """
+    forced = isinstance(event, dict) and event.get("force")
+    return warm_cache.fresh() if forced else nullcontext()
+
+
+def run_task(task, event=""):
+    """Runs one `(scraper name, method)` call from `plan`."""
+    name, method = task
+    with _fetching(event):
+        getattr(get_scraper(name), method)(event)
+
+
+def run(countries=None, event="", concurrent=True):
+    """
+    Scrapes the given countries (default: `DEFAULT_COUNTRIES`) and writes them in one batch.
+
+    Whole scrapers get their pages prefetched together (all but the
+    `streamed` ones), and with
+    `concurrent` the scrapers themselves run side by side.
+
+    Returns:
+        dict: `(scraper name, method)` to the exception it raised, for every task that failed.
+    """
+    tasks = plan(countries)
+    with _fetching(event):
+        prefetch(
+            url
+            for name, method in tasks if method == "scrape"
+            for url in get_scraper(name).urls if url not in get_scraper(name).streamed
+        )
+
+    errors = {}
+
+    def attempt(task):
+        try:
+            run_task(task, event)
+        except Exception as e:
+            logging.exception('An error was encountered during scraping.')
+            errors[task] = e
+
+    # A single country has nothing to batch with, and its conditional put
+    # or touch is cheaper than a batched put.
+    with batch_writes() if len(tasks) > 1 else nullcontext():
+        if concurrent and len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+                list(pool.map(attempt, tasks))
+        else:
+            for task in tasks:
+                attempt(task)
+    log_summary()
+    return errors
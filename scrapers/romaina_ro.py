@@ -1,41 +1,55 @@
 from scrapers.base_scraper import BaseScraper
-from utils.dynamo import write_to_dynamo
+from utils.coordinates import extract_many as extract_coordinates_many
+from utils.dynamo import touch, write_to_dynamo
+from utils.extraction import LineSpec, extract_lines
+from utils.parsing import LXML
 from utils.reception import Reception
-from utils.utils import get_website_content, gmaps_url_to_lat_lon, normalize
+from utils.utils import extract_website, normalize, normalize_all
+from utils.timing import timed
 
 ROMANIA_INFO_URL = "https://www.politiadefrontiera.ro/ro/main/pg-conditii-generale-de-calatorie-a-cetatenilor-din-statele-care-nu-sunt-membre-ale-uniunii-europene-si-spatiului-economic-european-147.html"
 ROMANIA_MAP_URL = "https://www.politiadefrontiera.ro/ro/traficonline/?dt=1&vw=2"
 
+# The containers `get_general` and `_get_reception_points` look at.
+ROMANIA_INFO_TARGET = ("div", "mrow txtcontent")
+ROMANIA_MAP_TARGET = ("div", "txtcontent")
+# The general information: every paragraph of the info page's container.
+ROMANIA_GENERAL = LineSpec("div.mrow.txtcontent", "p")
+
 class RomaniaScraper(BaseScraper):
+
+    urls = (ROMANIA_INFO_URL, ROMANIA_MAP_URL)
+    parser = LXML
+
     def scrape(self, event = ""):
         print("Scraping Romania (RO)")
+        if self._unchanged(event, "romania-ro", ROMANIA_INFO_URL, ROMANIA_MAP_URL):
+            print("Romania (RO) is unchanged, skipping")
+            touch("romania-ro", event)
+            return
 
         """Start with general border info"""
-        content = get_website_content(ROMANIA_INFO_URL)
-        general = self.get_general(content)
+        general = extract_website(ROMANIA_INFO_URL, self.get_general, parser=self.parser, target=ROMANIA_INFO_TARGET)
 
         """Get border crossing points"""
-        reception_arr = self._get_reception_points(ROMANIA_MAP_URL)
-        write_to_dynamo("romania-ro", event, general, reception_arr, ROMANIA_INFO_URL)
+        reception_arr = extract_website(ROMANIA_MAP_URL, self._get_reception_points, parser=self.parser, target=ROMANIA_MAP_TARGET)
+        write_to_dynamo("romania-ro", event, general, reception_arr, ROMANIA_INFO_URL, self._sources(ROMANIA_INFO_URL, ROMANIA_MAP_URL))
 
+    @timed("extract")
     def get_general(self, content):
         """Gets general border crossing information."""
-        main_div = content.find("div", class_="mrow txtcontent")
-        items = main_div.findAll("p")
-        text_arr = []
-        for item in items:
-            text_arr.append(normalize(item.get_text(strip=True, separator=" ")))
-        return text_arr
-
-    def _get_reception_points(self, url):
+        return normalize_all(extract_lines(ROMANIA_GENERAL, content))
+
+    @timed("extract")
+    def _get_reception_points(self, content):
         recep_arr = []
-        content = get_website_content(url)
 
         """Get a list of table rows"""
         main_div = content.find("div", class_="txtcontent")
         rows = main_div.findAll("tr")
 
         """Get crossing info from each table row cell"""
+        hrefs = []
         for row in rows:
             """Skip table header row"""
             if row.find("th") is not None:
@@ -49,7 +63,13 @@ class RomaniaScraper(BaseScraper):
             #wait_time = cells[1]
             #info = cells[2]
             gmaps = cells[3].find("a", href=True)
-            r.lat, r.lon = gmaps_url_to_lat_lon(gmaps['href'])
+            hrefs.append(gmaps['href'])
             recep_arr.append(r)
-        
+
+        """Extract every map link's coordinates at once"""
+        for r, coordinates in zip(recep_arr, extract_coordinates_many(hrefs, text=True)):
+            if coordinates is None:
+                raise ValueError(f"No coordinates for {r.name}")
+            r.lat, r.lon = coordinates
+
         return recep_arr
\ No newline at end of file
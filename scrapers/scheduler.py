@@ -0,0 +1,96 @@
+"""
+Runs scrapers in a process pool and writes their results from the parent.
+
+The parent downloads every page up front over its pooled session and hands
+each worker the bodies it needs, so workers only parse and extract.  That
+includes KML maps, which workers then read whole rather than streamed.  Their
+`write_to_dynamo` and `touch` calls are captured and sent back, and the parent writes
+them all in one batch, so no worker ever creates a DynamoDB client.
+"""
+
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import utils.timing
+from scrapers.registry import get_scraper, plan, run_task
+from utils.dynamo import batch_writes, capture_writes, replay
+from utils.fetch import prefetch, seed_prefetched, take_prefetched
+
+
+@dataclass
+class ScrapeResult:
+    """What a worker sends back for one `(scraper name, method)` task."""
+    task: tuple
+    # Argument tuples of the task's `write_to_dynamo` and `touch` calls.
+    writes: list = field(default_factory=list)
+    # Stage name -> seconds.
+    timings: dict = field(default_factory=dict)
+    # The `utils.timing` records of the task's stages.
+    stages: list = field(default_factory=list)
+    # Formatted traceback if the task failed.
+    error: str = ""
+
+    @property
+    def countries(self):
+        return [args[0] for args in self.writes]
+
+
+def _work(task, event, prefetched):
+    seed_prefetched(prefetched)
+    # A forked worker starts with a copy of the parent's records; they aren't this task's.
+    utils.timing.drain()
+    start = time.perf_counter()
+    result = ScrapeResult(task)
+    with capture_writes() as writes:
+        try:
+            run_task(task, event)
+        except Exception:
+            result.error = traceback.format_exc()
+    result.writes = writes
+    result.timings["scrape"] = time.perf_counter() - start
+    result.stages = utils.timing.drain()
+    return result
+
+
+def run_in_pool(countries=None, event="", processes=None):
+    """
+    Scrapes the given countries in worker processes, then writes every result in one batch.
+
+    Returns:
+        list[ScrapeResult]: One per task of `plan(countries)`, in plan order.
+    """
+    tasks = plan(countries)
+    if not tasks:
+        return []
+
+    # Fetch every task's pages here, once, and give each worker its own.
+    urls = {task: get_scraper(task[0]).urls_of(task[1]) for task in tasks}
+    prefetch(url for task_urls in urls.values() for url in task_urls)
+    bodies = {task: take_prefetched(task_urls) for task, task_urls in urls.items()}
+
+    processes = processes or min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_work, task, event, bodies[task]) for task in tasks]
+        results = [future.result() for future in futures]
+
+    start = time.perf_counter()
+    with batch_writes():
+        for result in results:
+            for args in result.writes:
+                replay(args)
+    write_seconds = time.perf_counter() - start
+
+    for result in results:
+        utils.timing.add(result.stages)
+        name, method = result.task
+        if result.error:
+            logging.error("%s.%s failed:\n%s", name, method, result.error)
+        else:
+            print(f"{name}.{method}: {', '.join(result.countries)} in {result.timings['scrape']:.3f}s")
+    print(f"Wrote {sum(len(result.writes) for result in results)} items in {write_seconds:.3f}s")
+    utils.timing.log_summary()
+    return results
@@ -1,15 +1,13 @@
 from typing import List
 
-import requests
-import xmltodict
 from bs4 import BeautifulSoup
 
 from scrapers.base_scraper import BaseScraper
 
-from utils.constants import HEADERS
 from utils.dynamo import write_to_dynamo
-from utils.reception import Reception
-from utils.utils import get_reception_points, get_website_content, normalize
+from utils.reception import Receptions
+from utils.utils import get_website_content
+from utils.timing import timed
 
 SLOVAKIA_POINTS_URL = "https://www.minv.sk/?hranicne-priechody-1"
 
@@ -48,6 +46,9 @@ def _print_to_file(message: str) -> None:
 
 class SlovakiaScraper(BaseScraper):
 
+    urls = (SLOVAKIA_KML,)
+    streamed = (SLOVAKIA_KML,)
+
     def scrape(self, event = ""):
         print("Scraping Slovakia (SK)")
 
@@ -82,34 +83,13 @@ class SlovakiaScraper(BaseScraper):
         # TODO: Replace `""` with the proper URL, once it's clear which one that is.
         write_to_dynamo("slovakia-sk", event, general, reception_arr, "")
 
+    @timed("extract")
     def _get_general(self, content: BeautifulSoup) -> List[str]:
         # TODO: Implement.
         return [""]
 
-    def _get_reception_points(self) -> List[Reception]:
-        kml_str = requests.get(SLOVAKIA_KML, headers=HEADERS).content
-        kml = xmltodict.parse(kml_str, dict_constructor=dict)
-
-        # A modified copy of `get_reception_points` which, for now, works with
-        # KML file "v3". There's still stuff missing, though (e.g. address).
-        # What works: Using Mali Selmentsi as an example, lat & long seems to
-        # work at least.
-        reception_points: list[Reception] = []
-        placemarks: List = kml["kml"]["Document"]["Folder"]["Placemark"]
-        for placemark in placemarks:
-            r = Reception()
-            r.name = normalize(placemark["name"])
-            coord = placemark["Point"]["coordinates"].split(',')
-            r.lon = coord[0].strip()
-            r.lat = coord[1].strip()
-            reception_points.append(r)
-
-        return reception_points
-
-        # Neither the KML file "v1", "v2" nor "v3" are working with this so far.
-        # return get_reception_points(
-        #     kml=kml,
-        #     # folder_name_whitelist=None,
-        #     folder_name_whitelist=["Slovakia-Ukraine Border Checkpoints - Without cargo-only checkpoints"],
-        #     style_urls_blacklist=[],
-        # )
+    def _get_reception_points(self) -> Receptions:
+        # Works with KML file "v3". There's still stuff missing, though (e.g.
+        # address). What works: Using Mali Selmentsi as an example, lat & long
+        # seems to work at least.
+        return self._read_map(SLOVAKIA_KML)
@@ -0,0 +1,36 @@
+import pytest
+
+from utils.coordinates import extract, extract_many, extract_pin
+
+PIN = 'https://www.google.pl/maps/place/X/@50.5879307,24.0283211,17z/data=!3m1!4b1!8m2!3d50.5879273!4d24.0305098'
+
+
+@pytest.mark.parametrize('url, expected', [
+    (PIN, (50.5879273, 24.0305098)),
+    (PIN + '!16s%2Fg%2F11?entry=ttu', (50.5879273, 24.0305098)),
+    ('https://www.google.com/maps/dir//47.9519,26.0716', (47.9519, 26.0716)),
+    ('https://maps.google.com/?q=48.1286973,28.4190675', (48.1286973, 28.4190675)),
+    ('https://www.google.com/maps/search/?api=1&query=47.5%2C-122.3', (47.5, -122.3)),
+    ('https://www.google.com/maps/@46.1,16.2,15z', (46.1, 16.2)),
+    ('https://www.google.com/maps/@146.1,16.2,15z', None),
+    ('https://goo.gl/maps/abc', None),
+])
+def test_extract(url, expected):
+    assert extract(url) == expected
+
+
+def test_extract_many_keeps_order():
+    assert extract_many([PIN, 'https://goo.gl/maps/abc', PIN]) == [(50.5879273, 24.0305098), None, (50.5879273, 24.0305098)]
+
+
+def test_extract_pin_only_reads_place_pins():
+    assert extract_pin(PIN) == (50.5879273, 24.0305098)
+    assert extract_pin('https://x/!3d99!4d1/data=!3d10.5!4d20.5') == (10.5, 20.5)
+    assert extract_pin('https://maps.google.com/?q=52.2,21.0') is None
+    assert extract_pin('https://www.google.com/maps/@46.1,16.2,15z') is None
+
+
+def test_text_keeps_coordinates_as_written():
+    assert extract(PIN, text=True) == ('50.5879273', '24.0305098')
+    assert extract('https://www.google.com/maps/@46.500000,16.2,15z', text=True) == ('46.500000', '16.2')
+    assert extract_many(['https://goo.gl/maps/abc'], text=True) == [None]
@@ -0,0 +1,195 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+import utils.dynamo
+from utils.dynamo import TABLE_NAME, batch_writes, capture_writes, replay, touch, write_to_dynamo
+from utils.dynamo_local import LocalDynamoClient
+from utils.reception import Reception
+
+
+@pytest.fixture()
+def client():
+    client = MagicMock(name='client')
+    with patch('utils.dynamo.client', client), patch('utils.dynamo._last_hashes', {}):
+        yield client
+
+
+def conditional_check_failed(**kwargs):
+    raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'PutItem')
+
+
+def test_unchanged_content_only_touches_timestamps(client):
+    reception = [Reception(name='A', lat='1', lon='2')]
+    write_to_dynamo('poland-pl', '', ['a', 'a', 'b'], reception, 'src')
+    item = client.put_item.call_args.kwargs['Item']
+    assert item['general'] == {'L': [{'S': 'a'}, {'S': 'b'}]}
+    assert item['contentHash']['S']
+
+    # A warm invocation remembers the hash and doesn't attempt the put.
+    write_to_dynamo('poland-pl', '', ['a', 'b'], reception, 'src')
+    assert client.put_item.call_count == 1
+    assert client.update_item.call_args.kwargs['Key'] == {'country': {'S': 'poland-pl'}}
+
+
+def test_conditional_put_failure_falls_back_to_touch(client):
+    client.put_item.side_effect = conditional_check_failed
+    write_to_dynamo('moldova-ro', '', ['a'], [], 'src')
+    assert client.update_item.call_count == 1
+
+
+def test_skip_policy_writes_nothing(client):
+    with patch('utils.dynamo.UNCHANGED_POLICY', 'skip'):
+        client.put_item.side_effect = conditional_check_failed
+        write_to_dynamo('moldova-ro', '', ['a'], [], 'src')
+    assert not client.update_item.called
+
+
+def test_touch_follows_the_unchanged_policy(client):
+    touch('hungary-hu', {'testSuffix': '-test'})
+    assert client.update_item.call_args.kwargs['Key'] == {'country': {'S': 'hungary-hu-test'}}
+    with patch('utils.dynamo.UNCHANGED_POLICY', 'skip'):
+        touch('hungary-hu', '')
+    assert client.update_item.call_count == 1
+
+
+def test_content_hash_covers_content_and_source():
+    base = utils.dynamo.content_hash([{'S': 'a'}], [], 'src')
+    assert base == utils.dynamo.content_hash([{'S': 'a'}], [], 'src')
+    assert base != utils.dynamo.content_hash([{'S': 'b'}], [], 'src')
+    assert base != utils.dynamo.content_hash([{'S': 'a'}], [], 'other')
+
+
+def write_countries(count):
+    for i in range(count):
+        write_to_dynamo(f'country-{i}', '', [f'line {i}'], [Reception(name=str(i))], 'src')
+
+
+def test_batch_writes_chunk_and_retry_unprocessed_items():
+    local = LocalDynamoClient(max_batch_items=10)
+    delays = []
+    with patch('utils.dynamo._last_hashes', {}):
+        with batch_writes(local) as buffer:
+            buffer.sleep = delays.append
+            write_countries(30)
+            assert local.calls == []
+
+    table = local.tables[TABLE_NAME]
+    assert len(table) == 30
+    assert table['country-29']['general'] == {'L': [{'S': 'line 29'}]}
+    # First chunk of 25 needs three calls, the remaining 5 fit in one.
+    assert local.calls == ['batch_get_item'] + ['batch_write_item'] * 4
+    assert delays == [0.05, 0.1]
+
+
+def test_batch_writes_give_up_after_max_retries():
+    local = LocalDynamoClient(max_batch_items=0)
+    with patch('utils.dynamo._last_hashes', {}):
+        with pytest.raises(RuntimeError, match='1 items still unprocessed'):
+            with batch_writes(local) as buffer:
+                buffer.sleep = lambda delay: None
+                write_countries(1)
+    assert local.calls == ['batch_get_item'] + ['batch_write_item'] * 6
+
+
+def test_local_client_honours_content_hash_condition():
+    local = LocalDynamoClient()
+    with patch('utils.dynamo.client', local), patch('utils.dynamo._last_hashes', {}):
+        write_countries(1)
+        utils.dynamo._last_hashes.clear()
+        write_countries(1)
+    assert local.calls == ['put_item', 'put_item', 'update_item']
+    assert set(local.tables[TABLE_NAME]['country-0']) >= {'contentHash', 'isoFormat', 'dateTime'}
+
+
+def test_batch_writes_only_put_changed_content_after_a_cold_start():
+    local = LocalDynamoClient()
+    with patch('utils.dynamo.client', local), patch('utils.dynamo._last_hashes', {}):
+        write_countries(3)
+        stored = local.tables[TABLE_NAME]['country-1']
+        utils.dynamo._last_hashes.clear()
+        local.calls.clear()
+
+        with batch_writes(local):
+            write_countries(2)
+            write_to_dynamo('country-2', '', ['changed'], [], 'src')
+
+    assert local.calls == ['batch_get_item', 'update_item', 'update_item', 'batch_write_item']
+    assert local.tables[TABLE_NAME]['country-1']['general'] == stored['general']
+    assert local.tables[TABLE_NAME]['country-2']['general'] == {'L': [{'S': 'changed'}]}
+
+
+def test_nested_batch_writes_join_the_outer_flush():
+    local = LocalDynamoClient()
+    with patch('utils.dynamo._last_hashes', {}):
+        with batch_writes(local):
+            with batch_writes():
+                write_countries(2)
+            assert local.calls == []
+            write_to_dynamo('other', '', [], [], 'src')
+    assert local.calls == ['batch_get_item', 'batch_write_item']
+    assert len(local.tables[TABLE_NAME]) == 3
+
+
+def test_captured_writes_can_be_replayed():
+    local = LocalDynamoClient()
+    with patch('utils.dynamo.client', local), patch('utils.dynamo._last_hashes', {}):
+        with capture_writes() as writes:
+            write_countries(2)
+            touch('country-0', '')
+        assert local.calls == []
+        with batch_writes():
+            for args in writes:
+                replay(args)
+    assert sorted(local.tables[TABLE_NAME]) == ['country-0', 'country-1']
+    assert 'update_item' in local.calls
+
+
+def test_update_mode_only_sets_changed_attributes():
+    local = LocalDynamoClient()
+    points = [Reception(name='A', lat='1', lon='2'), Reception(name='B', lat='3', lon='4')]
+    with patch('utils.dynamo.client', local), patch('utils.dynamo._last_hashes', {}), \
+            patch('utils.dynamo._snapshots', {}), patch('utils.dynamo.WRITE_MODE', 'update'):
+        assert write_to_dynamo('poland-pl', '', ['a'], points, 'src') is None
+        utils.dynamo._snapshots.clear()
+
+        points[1].lat = '3.5'
+        changes = write_to_dynamo('poland-pl', '', ['a', 'b'], points + [Reception(name='C')], 'src')
+
+    assert local.calls == ['get_item', 'put_item', 'get_item', 'update_item']
+    assert changes.attributes == ['general', 'reception']
+    assert changes.changes['general'] == {'added': ['b']}
+    assert [p['name'] for p in changes.changes['reception']['added']] == ['C']
+    assert changes.changes['reception']['modified'] == [{'name': 'B', 'fields': {'lat': ['3', '3.5']}}]
+
+    item = local.tables[TABLE_NAME]['poland-pl']
+    assert item['general'] == {'L': [{'S': 'a'}, {'S': 'b'}]}
+    assert len(item['reception']['L']) == 3
+    assert item['changes']['S'] == changes.to_json()
+
+
+def test_update_mode_puts_over_items_without_a_hash():
+    local = LocalDynamoClient()
+    local.tables[TABLE_NAME] = {'poland-pl': {'country': {'S': 'poland-pl'}, 'general': {'L': [{'S': 'old'}]}}}
+    with patch('utils.dynamo.client', local), patch('utils.dynamo._last_hashes', {}), \
+            patch('utils.dynamo._snapshots', {}), patch('utils.dynamo.WRITE_MODE', 'update'):
+        assert write_to_dynamo('poland-pl', '', ['a'], [], 'src') is None
+
+    assert local.calls == ['get_item', 'put_item']
+    item = local.tables[TABLE_NAME]['poland-pl']
+    assert item['general'] == {'L': [{'S': 'a'}]}
+    assert item['contentHash']['S']
+
+
+def test_sources_are_committed_only_after_a_successful_write(client):
+    committed = []
+    with patch('utils.dynamo.commit_sources', lambda *args: committed.append(args)):
+        client.put_item.side_effect = ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'PutItem')
+        with pytest.raises(ClientError):
+            write_to_dynamo('moldova-ro', '', ['a'], [], 'src', {'https://a.example/': 'v1'})
+        assert committed == []
+
+        client.put_item.side_effect = None
+        write_to_dynamo('moldova-ro', {'testSuffix': '-test'}, ['a'], [], 'src', {'https://a.example/': 'v1'})
+    assert committed == [('moldova-ro-test', {'https://a.example/': 'v1'})]
@@ -0,0 +1,26 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from utils.extraction import LineSpec, extract_lines
+
+PAGE = BeautifulSoup('''
+<div class="editor-content other">
+  <ul><li>First <b>line</b></li><li>  Second  </li><li class="x">Third</li></ul>
+  <p><span>RECEPTION POINT ADDRESS</span></p><ul><li>After</li></ul>
+</div>
+''', 'html.parser')
+
+
+def test_extracts_lines_up_to_the_stop_text():
+    spec = LineSpec('div.editor-content', 'li, p', stop_text='RECEPTION POINT ADDRESS')
+    assert extract_lines(spec, PAGE) == ['First line', 'Second', 'Third']
+
+
+def test_tag_only_items_match_like_css():
+    assert extract_lines(LineSpec('div.other', 'li'), PAGE) == ['First line', 'Second', 'Third', 'After']
+    assert extract_lines(LineSpec('div.other', 'li.x'), PAGE) == ['Third']
+
+
+def test_missing_root_is_an_error():
+    with pytest.raises(ValueError):
+        extract_lines(LineSpec('div.missing', 'p'), PAGE)
@@ -0,0 +1,181 @@
+import threading
+import time
+
+import pytest
+
+import utils.fetch
+import utils.warm_cache
+from utils.fetch import (
+    FetchResult, commit, fetch, fetch_all, fetch_chunks, prefetch, seed_prefetched, take_prefetched, unchanged, versions,
+)
+from utils.fetch_cache import FetchCache
+
+
+@pytest.fixture()
+def fake_get(monkeypatch):
+    """Stand-in for the network that records peak concurrency per host."""
+    lock = threading.Lock()
+    in_flight = {}
+    peak = {}
+
+    def _get(url, headers):
+        host = url.split('/')[2]
+        with lock:
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+        time.sleep(0.05)
+        with lock:
+            in_flight[host] -= 1
+        if url.endswith('broken'):
+            raise ConnectionError(url)
+        return FetchResult(url, url.encode())
+
+    monkeypatch.setattr(utils.fetch, '_get', _get)
+    monkeypatch.setattr(utils.fetch, '_prefetched', {})
+    return peak
+
+
+def test_fetch_all_caps_concurrency_per_host(fake_get):
+    urls = [f'https://a.example/{i}' for i in range(6)] + ['https://b.example/0']
+    results = fetch_all(urls, per_host_limit=2)
+    assert {url: r.content for url, r in results.items()} == {url: url.encode() for url in urls}
+    assert fake_get == {'a.example': 2, 'b.example': 1}
+
+
+def test_prefetch_serves_fetch_and_leaves_failures(fake_get):
+    prefetch(['https://a.example/ok', 'https://a.example/broken'])
+    assert list(utils.fetch._prefetched) == ['https://a.example/ok']
+    assert fetch('https://a.example/ok') == b'https://a.example/ok'
+    assert 'https://a.example/ok' not in utils.fetch._prefetched
+    with pytest.raises(ConnectionError):
+        fetch('https://a.example/broken')
+
+
+def test_prefetched_results_can_be_handed_over(fake_get, monkeypatch):
+    monkeypatch.setattr(utils.fetch, '_versions', {})
+    prefetch(['https://a.example/a', 'https://a.example/b'])
+    taken = take_prefetched(['https://a.example/a', 'https://a.example/missing'])
+    assert list(taken) == ['https://a.example/a']
+    assert list(utils.fetch._prefetched) == ['https://a.example/b']
+
+    utils.fetch._versions.clear()
+    seed_prefetched(taken)
+    assert versions(['https://a.example/a'])['https://a.example/a'] is not None
+    assert fetch('https://a.example/a') == b'https://a.example/a'
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+class FakeSession:
+    """Serves `body` with an ETag, and 304 to requests that send it back."""
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+        self.streams = []
+
+    def get(self, url, headers, stream=False, timeout=None):
+        self.requests.append(headers)
+        self.streams.append(stream)
+        if headers.get('If-None-Match') == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.body, {'ETag': self.etag})
+
+
+def test_conditional_get_serves_cached_body(monkeypatch, tmp_path):
+    session = FakeSession(b'<html/>', '"v1"')
+    monkeypatch.setattr(utils.fetch, 'get_transport', lambda: session)
+    monkeypatch.setattr(utils.fetch, 'cache', FetchCache(str(tmp_path)))
+    monkeypatch.setattr(utils.fetch, '_prefetched', {})
+    monkeypatch.setattr(utils.fetch, '_versions', {})
+    monkeypatch.setattr(utils.warm_cache, 'bodies', None)
+    url = 'https://a.example/page'
+
+    assert not unchanged([url], 'poland-pl')
+    assert fetch(url) == b'<html/>'
+    assert 'If-None-Match' not in session.requests[0]
+
+    # Nothing was written yet, so the 304 doesn't make the page unchanged.
+    assert not unchanged([url], 'poland-pl')
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    assert fetch(url) == b'<html/>'
+
+    commit('poland-pl', versions([url]))
+    assert unchanged([url], 'poland-pl')
+    assert utils.fetch._prefetched == {}
+    # Another destination, like a test suffix, has its own committed sources.
+    assert not unchanged([url], 'poland-pl-test')
+    utils.fetch._prefetched.clear()
+
+    session.etag = '"v2"'
+    session.body = b'<html>new</html>'
+    assert not unchanged([url], 'poland-pl')
+    assert fetch(url) == b'<html>new</html>'
+    assert FetchCache(str(tmp_path)).get(url).etag == '"v2"'
+
+
+def test_warm_bodies_are_served_without_fetching(monkeypatch):
+    session = FakeSession(b'<html/>', '"v1"')
+    monkeypatch.setattr(utils.fetch, 'get_transport', lambda: session)
+    monkeypatch.setattr(utils.fetch, 'cache', None)
+    monkeypatch.setattr(utils.fetch, '_prefetched', {})
+    monkeypatch.setattr(utils.warm_cache, 'bodies', utils.warm_cache.TTLCache(60, 1024))
+
+    assert fetch('https://a.example/page') == b'<html/>'
+    assert b''.join(fetch_chunks('https://a.example/page')) == b'<html/>'
+    assert not unchanged(['https://a.example/page'], 'poland-pl')
+    assert len(session.requests) == 1
+
+    assert fetch('https://a.example/page') == b'<html/>'
+
+    # A forced scrape fetches again, and keeps the new body.
+    session.body = b'<html>new</html>'
+    with utils.warm_cache.fresh():
+        assert fetch('https://a.example/page') == b'<html>new</html>'
+    assert fetch('https://a.example/page') == b'<html>new</html>'
+    assert len(session.requests) == 2
+
+
+def test_streamed_urls_are_only_started(monkeypatch, tmp_path):
+    session = FakeSession(b'<kml/>', '"v1"')
+    monkeypatch.setattr(utils.fetch, 'get_transport', lambda: session)
+    monkeypatch.setattr(utils.fetch, 'cache', FetchCache(str(tmp_path)))
+    monkeypatch.setattr(utils.fetch, '_prefetched', {})
+    monkeypatch.setattr(utils.fetch, '_streams', {})
+    monkeypatch.setattr(utils.fetch, '_versions', {})
+    monkeypatch.setattr(utils.warm_cache, 'bodies', None)
+    url = 'https://a.example/map.kml'
+
+    # Nothing was written yet, so there's nothing to start.
+    assert not unchanged([url], 'hungary-hu', streamed=[url])
+    assert session.requests == []
+    assert b''.join(fetch_chunks(url)) == b'<kml/>'
+    commit('hungary-hu', versions([url]))
+
+    # A 304 comes whole with its first chunk, so it can be compared.
+    assert unchanged([url], 'hungary-hu', streamed=[url])
+    assert utils.fetch._streams == {}
+
+    # A new body can't be compared before it's read, and is read only once.
+    session.etag = '"v2"'
+    session.body = b'<kml>new</kml>'
+    assert not unchanged([url], 'hungary-hu', streamed=[url])
+    assert b''.join(fetch_chunks(url)) == b'<kml>new</kml>'
+    assert session.streams == [True, True, True]
+    assert versions([url])[url] == utils.warm_cache.content_hash(b'<kml>new</kml>')
@@ -0,0 +1,56 @@
+from utils.kml import read_reception_points
+
+KML = b'''<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2">
+  <Document>
+    <name>Map</name>
+    <Placemark><name>Outside any folder</name><Point><coordinates>1,2,0</coordinates></Point></Placemark>
+    <Folder>
+      <name>Border crossing point\xc2\xa0/ Hat\xc3\xa1r</name>
+      <Placemark>
+        <name>Letenye</name>
+        <styleUrl>#icon-ok</styleUrl>
+        <Point><coordinates>
+          16.697088,46.420334,0
+        </coordinates></Point>
+      </Placemark>
+      <Placemark>
+        <name>Closed</name>
+        <styleUrl>#icon-closed</styleUrl>
+        <Point><coordinates>17,47,0</coordinates></Point>
+      </Placemark>
+      <Placemark><name>Route</name><LineString><coordinates>1,2 3,4</coordinates></LineString></Placemark>
+      <Folder>
+        <name>Nested</name>
+        <Placemark><name>Too deep</name><Point><coordinates>5,6,0</coordinates></Point></Placemark>
+      </Folder>
+    </Folder>
+    <Folder>
+      <name>Aid points</name>
+      <Placemark><name>Aid</name><Point><coordinates>18,48,0</coordinates></Point></Placemark>
+    </Folder>
+  </Document>
+</kml>
+'''
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_reads_top_level_folders_only():
+    points = list(read_reception_points([KML]))
+    assert [(p.name, p.lat, p.lon) for p in points] == [
+        ('Letenye', 46.420334, 16.697088),
+        ('Closed', 47.0, 17.0),
+        ('Aid', 48.0, 18.0),
+    ]
+
+
+def test_filters_apply_across_chunk_boundaries():
+    points = read_reception_points(
+        chunked(KML, 7),
+        folder_name_whitelist=['Border crossing point'],
+        style_urls_blacklist=['#icon-closed'],
+    )
+    assert [p.name for p in points] == ['Letenye']
@@ -0,0 +1,12 @@
+from utils.parsing import HTML_PARSER, LXML_DIRECT, parse_html
+
+PAGE = '<html><body><div class="editor-content"><p>Przejście graniczne</p></div></body></html>'.encode('utf-8')
+
+
+def test_declared_encoding_is_honoured_by_every_backend():
+    # Latin-1 bytes that detection would not take for UTF-8.
+    page = PAGE.decode('utf-8').replace('ś', 'é').encode('latin-1')
+    soup = parse_html(page, HTML_PARSER, ('div', 'editor-content'), encoding='latin-1')
+    assert soup.find('p').get_text() == 'Przejécie graniczne'
+    tree = parse_html(page, LXML_DIRECT, encoding='latin-1')
+    assert tree.xpath('//p/text()') == ['Przejécie graniczne']
@@ -0,0 +1,75 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from scrapers.poland import PolandScraper, read_reception_points
+from utils.dynamo import capture_writes
+
+PLACE = 'https://www.google.pl/maps/place/X/@50.1,23.1,17z/data=!3m1!4b1!8m2!3d{lat}!4d{lon}'
+
+
+def block(html):
+    return BeautifulSoup(f'<div class="editor-content">{html}</div>', 'html.parser').div
+
+
+def point(lat, lon, text, img=''):
+    return f'<p><u><a href="{PLACE.format(lat=lat, lon=lon)}"><span>{text}</span> <strong>Town</strong></a></u>{img}</p>'
+
+
+def qr(name):
+    return f'<p><img src="https://qr/{name}.png"/></p>'
+
+
+def test_list_starts_at_the_first_place_link_and_pairs_qr_codes():
+    points = read_reception_points(block(
+        '<p>Intro</p><p>More intro</p><p><strong>Adresy</strong></p>'
+        + point(50.5, 23.5, 'Hall, ul. A 1', '<img src="https://qr/first.png"/>')
+        + point(50.6, 23.6, 'School, ul. B 2') + qr('second') + '<p> </p>'
+        + point(50.7, 23.7, 'Gym, ul. C 3') + qr('third')
+        + '<p><a href="https://www.gov.pl/web/udsc">More</a></p>' + point(1, 1, 'After')
+    ), link_names=True)
+    assert [(r.name, r.address, r.lat, r.lon, r.qr) for r in points] == [
+        ('Hall, ul. A 1', 'Hall, ul. A 1 Town', 50.5, 23.5, 'https://qr/first.png'),
+        ('School, ul. B 2', 'School, ul. B 2 Town', 50.6, 23.6, 'https://qr/second.png'),
+        ('Gym, ul. C 3', 'Gym, ul. C 3 Town', 50.7, 23.7, 'https://qr/third.png'),
+    ]
+
+
+def test_list_runs_between_the_english_headings():
+    points = read_reception_points(block(
+        '<div><p><span>Intro</span></p><p><span><strong>RECEPTION POINT ADDRESS</strong></span></p>'
+        + qr('stray') + point(50.5, 23.5, 'Hall') + qr('hall') + point(50.6, 23.6, 'School')
+        + '<p><span><strong>What next?</strong></span></p>' + point(50.7, 23.7, 'Later') + '</div>'
+    ))
+    assert [(r.name, r.qr) for r in points] == [('Hall Town', 'https://qr/hall.png'), ('School Town', '')]
+
+
+def test_list_ends_at_a_link_without_a_place_pin():
+    points = read_reception_points(block(
+        point(50.5, 23.5, 'Hall') + '<p><a href="https://maps.google.com/?q=52.2,21.0">Office</a></p>'
+        + point(50.6, 23.6, 'School')
+    ), link_names=True)
+    assert [r.name for r in points] == ['Hall']
+
+
+def test_only_an_image_only_paragraph_right_after_a_point_is_its_qr_code():
+    points = read_reception_points(block(
+        point(50.5, 23.5, 'Hall') + '<p>Open daily</p>' + qr('late')
+        + point(50.6, 23.6, 'School') + '<p>Contact us <img src="https://qr/logo.png"/></p>'
+        + point(50.7, 23.7, 'Gym') + '<p> </p>' + qr('gym') + qr('extra')
+        + '<p>Footer</p><p>Contact us <img src="https://qr/logo.png"/></p>'
+    ), link_names=True)
+    assert [(r.name, r.qr) for r in points] == [('Hall', ''), ('School', ''), ('Gym', 'https://qr/gym.png')]
+
+
+def test_other_locales_are_written_before_a_failure_is_raised(monkeypatch):
+    def extract_poland(self, url, locale, event):
+        if locale == 'en':
+            raise ValueError('no reception points')
+        return [locale], []
+
+    monkeypatch.setattr(PolandScraper, 'extract_poland', extract_poland)
+    monkeypatch.setattr(PolandScraper, '_sources', lambda self, *urls: None)
+    with capture_writes() as writes:
+        with pytest.raises(ValueError, match='no reception points'):
+            PolandScraper().scrape()
+    assert [args[0] for args in writes] == ['poland-pl', 'poland-ua']
@@ -0,0 +1,64 @@
+import pytest
+import requests
+
+from utils.policy import DeadlineExceeded, FetchPolicy, TokenBucket, deadline
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FlakyTransport:
+    """Fails with each of `outcomes` in turn: an exception to raise or a status to answer."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.timeouts = []
+
+    def get(self, url, headers, stream=False, timeout=None):
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return Response(outcome)
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    now[0] = 10.0
+    assert bucket.reserve() == 0.0
+
+
+def test_retries_connection_errors_and_5xx_with_backoff():
+    sleeps = []
+    policy = FetchPolicy(max_retries=2, sleep=sleeps.append)
+    transport = FlakyTransport(requests.ConnectionError(), 503, 200)
+    record = {}
+    assert policy.get(transport, 'https://a.example/', {}, record=record).status_code == 200
+    assert record == {'attempts': 3}
+    assert len(sleeps) == 2 and all(0 <= delay <= policy.max_backoff for delay in sleeps)
+
+
+def test_last_retryable_response_is_returned():
+    policy = FetchPolicy(max_retries=1, sleep=lambda delay: None)
+    assert policy.get(FlakyTransport(500, 502), 'https://a.example/', {}).status_code == 502
+
+
+def test_deadline_caps_timeouts_and_stops_fetching():
+    policy = FetchPolicy(sleep=lambda delay: None)
+    transport = FlakyTransport(200)
+    with deadline(1.0):
+        policy.get(transport, 'https://a.example/', {})
+    connect, read = transport.timeouts[0]
+    assert connect <= 1.0 and read <= 1.0
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            policy.get(FlakyTransport(200), 'https://a.example/', {})
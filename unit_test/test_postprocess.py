@@ -0,0 +1,18 @@
+import pytest
+
+from utils.postprocess import dedupe_general
+
+
+def test_exact_dedupe_keeps_first_occurrence_in_order():
+    assert dedupe_general(['b', 'a', 'b', 'c', 'a'], 'exact') == ['b', 'a', 'c']
+
+
+def test_near_dedupe_ignores_whitespace_and_case():
+    lines = ['Open  24h', 'open 24h ', 'OPEN\t24H', 'Closed']
+    assert dedupe_general(lines, 'near') == ['Open  24h', 'Closed']
+    assert dedupe_general(lines, 'exact') == lines
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        dedupe_general([], 'fuzzy')
@@ -0,0 +1,24 @@
+import pickle
+
+from utils.reception import Reception, Receptions, as_dicts, as_dynamo
+
+
+def test_coordinates_are_floats_but_serialize_as_their_source_strings():
+    r = Reception(name='A')
+    r.lat, r.lon = '46.500000', '16.0'
+    assert (r.lat, r.lon) == (46.5, 16.0)
+    assert r.as_dict() == {'name': 'A', 'lat': '46.500000', 'lon': '16.0', 'address': '', 'qr': ''}
+    assert Reception(name='B', lat=1e-07, lon=16.0).as_dict()['lon'] == '16'
+    assert Reception(name='B').as_dict()['lat'] == ''
+
+
+def test_columns_serialize_like_single_points():
+    points = [Reception('A', 'addr', 'qr', 1.5, 2.25), Reception(name='B'), Reception('C', lat='46.500000', lon='16.0')]
+    columns = Receptions(points)
+    assert len(columns) == 3
+    assert columns.texts == {2: ('46.500000', '16.0')}
+    assert as_dicts(columns)[2]['lat'] == '46.500000'
+    assert list(columns) == points
+    assert as_dicts(columns) == as_dicts(points)
+    assert as_dynamo(columns) == [r.as_dynamo() for r in points]
+    assert pickle.loads(pickle.dumps(columns)) == columns
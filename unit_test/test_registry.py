@@ -0,0 +1,86 @@
+import pytest
+
+import utils.fetch
+import utils.warm_cache
+from scrapers import registry
+from scrapers.registry import COUNTRIES, DEFAULT_COUNTRIES, SCRAPERS, plan
+
+
+def test_default_plan_runs_each_scraper_once():
+    assert plan() == [
+        ('poland', 'scrape'),
+        ('hungary', 'scrape'),
+        ('moldova', 'scrape'),
+        ('romania', 'scrape'),
+    ]
+    assert 'slovakia-sk' not in DEFAULT_COUNTRIES
+
+
+def test_partial_plan_uses_per_country_methods():
+    assert plan(['romania-ro', 'poland-en', 'poland-ua']) == [
+        ('poland', 'scrape_poland_en'),
+        ('poland', 'scrape_poland_ua'),
+        ('romania', 'scrape'),
+    ]
+
+
+def test_unknown_country_is_rejected():
+    with pytest.raises(ValueError, match='narnia'):
+        plan(['narnia'])
+
+
+def test_every_planned_method_knows_its_urls():
+    for country in COUNTRIES:
+        name, method = COUNTRIES[country]
+        if name != 'slovakia':
+            assert registry.get_scraper(name).urls_of(method)
+    assert registry.get_scraper('poland').urls_of('scrape_poland_en') == ('https://www.gov.pl/web/udsc/ukraina-en',)
+
+
+def test_every_country_names_a_registered_scraper():
+    assert {name for name, _ in COUNTRIES.values()} == set(SCRAPERS)
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+        self.headers = {}
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers, stream=False, timeout=None):
+        self.requests.append(url)
+        return FakeResponse(b'new')
+
+
+class FakeScraper:
+    urls = ('https://a.example/map',)
+    streamed = ()
+
+    def __init__(self):
+        self.bodies = []
+
+    def scrape(self, event=''):
+        self.bodies.append(utils.fetch.fetch(self.urls[0]))
+
+
+def test_forced_run_prefetches_past_warm_bodies(monkeypatch):
+    session = FakeSession()
+    scraper = FakeScraper()
+    monkeypatch.setattr(utils.fetch, 'get_transport', lambda: session)
+    monkeypatch.setattr(utils.fetch, 'cache', None)
+    monkeypatch.setattr(utils.fetch, '_prefetched', {})
+    monkeypatch.setattr(utils.warm_cache, 'bodies', utils.warm_cache.TTLCache(60, 1024))
+    monkeypatch.setitem(registry._scrapers, 'hungary', scraper)
+    utils.warm_cache.bodies.put('https://a.example/map', b'old', 3)
+
+    assert registry.run(['hungary-hu'], {}) == {}
+    assert scraper.bodies == [b'old'] and session.requests == []
+
+    assert registry.run(['hungary-hu'], {'force': True}) == {}
+    assert scraper.bodies == [b'old', b'new']
+    assert session.requests == ['https://a.example/map']
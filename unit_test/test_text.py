@@ -0,0 +1,19 @@
+import unicodedata
+
+from utils.text import _clean_unicode, clean, clean_all
+
+
+def test_clean_normalizes_and_drops_invisible_characters():
+    assert clean('Dorohusk – osiedle ​') == 'Dorohusk – osiedle'
+    assert clean('a\xa0\xa0b\n\tc') == 'a b c'
+    assert clean('ﬁ') == 'fi'
+    assert clean_all(['  plain  ascii ', 'Łódź']) == ['plain ascii', unicodedata.normalize('NFKD', 'Łódź')]
+
+
+def test_only_non_ascii_text_is_cached():
+    _clean_unicode.cache_clear()
+    clean('ascii only')
+    clean('Przemyśl')
+    clean('Przemyśl')
+    info = _clean_unicode.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from utils import timing
+
+
+@pytest.fixture(autouse=True)
+def no_records():
+    timing.drain()
+    yield
+    timing.drain()
+
+
+def test_stages_are_summarized_per_name():
+    with timing.stage('fetch', url='a') as record:
+        record['bytes'] = 10
+    with timing.stage('fetch', url='b') as record:
+        record['bytes'] = 5
+    with pytest.raises(KeyError):
+        with timing.stage('parse'):
+            raise KeyError('x')
+
+    summary = timing.log_summary()
+    assert summary['fetch']['count'] == 2
+    assert summary['fetch']['bytes'] == 15
+    assert summary['parse']['errors'] == 1
+    assert timing.drain() == []
+
+
+def test_timed_counts_returned_items():
+    @timing.timed('extract')
+    def extract():
+        return [1, 2, 3]
+
+    assert extract() == [1, 2, 3]
+    [record] = timing.drain()
+    assert record['stage'] == 'extract'
+    assert record['items'] == 3
+    assert record['function'].endswith('extract')
+
+
+def test_abandoned_generator_is_not_an_error():
+    def chunks():
+        with timing.stage('fetch', url='a'):
+            yield b'x'
+            yield b'y'
+
+    stream = chunks()
+    next(stream)
+    stream.close()
+    [record] = timing.drain()
+    assert 'error' not in record
+
+
+def test_waiting_for_chunks_is_left_out_of_the_reading_stage():
+    def chunks():
+        with timing.stage('fetch') as record:
+            for chunk in (b'a', b'b'):
+                time.sleep(0.02)
+                with timing.paused(record):
+                    yield chunk
+
+    with timing.stage('extract') as record:
+        for _ in timing.excluding(chunks(), record):
+            time.sleep(0.02)
+    fetch, extract = timing.drain()
+    assert 0.035 < fetch['seconds'] < 0.06
+    assert 0.035 < extract['seconds'] < 0.06
+    assert 'paused' not in extract
@@ -0,0 +1,38 @@
+from utils.transport import CassetteResponse, RecordingTransport, ReplayTransport, read_cassette
+
+URL = 'https://a.example/page'
+
+
+class FakeTransport:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def get(self, url, headers, stream=False, timeout=None):
+        self.calls += 1
+        return self.response
+
+
+def test_recorded_responses_replay_without_the_network(tmp_path):
+    live = FakeTransport(CassetteResponse(200, {'ETag': '"v1"', 'Content-Encoding': 'gzip'}, b'<html/>'))
+    recorded = RecordingTransport(tmp_path, live).get(URL, {})
+    assert recorded.content == b'<html/>'
+
+    replayed = ReplayTransport(tmp_path).get(URL, {})
+    assert (replayed.status_code, replayed.content) == (200, b'<html/>')
+    # The body is stored decoded.
+    assert 'Content-Encoding' not in replayed.headers
+    assert b''.join(replayed.iter_content(3)) == b'<html/>'
+
+
+def test_replay_answers_matching_etag_with_304(tmp_path):
+    RecordingTransport(tmp_path, FakeTransport(CassetteResponse(200, {'ETag': '"v1"'}, b'body'))).get(URL, {})
+    replay = ReplayTransport(tmp_path)
+    assert replay.get(URL, {'If-None-Match': '"v1"'}).status_code == 304
+    assert replay.get(URL, {'If-None-Match': '"v0"'}).status_code == 200
+
+
+def test_recording_keeps_body_on_304(tmp_path):
+    RecordingTransport(tmp_path, FakeTransport(CassetteResponse(200, {}, b'body'))).get(URL, {})
+    RecordingTransport(tmp_path, FakeTransport(CassetteResponse(304, {}, b''))).get(URL, {})
+    assert read_cassette(tmp_path, URL).content == b'body'
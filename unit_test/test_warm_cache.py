@@ -0,0 +1,48 @@
+from utils import warm_cache
+from utils.warm_cache import TTLCache, remember
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_the_ttl():
+    clock = Clock()
+    cache = TTLCache(ttl=10, max_bytes=100, clock=clock)
+    cache.put('a', 'body', 4)
+    clock.now = 9.9
+    assert cache.get('a') == 'body'
+    clock.now = 10
+    assert cache.get('a') is None
+    assert (len(cache), cache.size, cache.hits, cache.misses) == (0, 0, 1, 1)
+
+
+def test_least_recently_used_entries_are_evicted_to_fit():
+    cache = TTLCache(ttl=10, max_bytes=10, clock=Clock())
+    cache.put('a', 1, 4)
+    cache.put('b', 2, 4)
+    cache.get('a')
+    cache.put('c', 3, 4)
+    assert [cache.get(key) for key in 'abc'] == [1, None, 3]
+    cache.put('d', 4, 11)
+    assert cache.get('d') is None
+    assert cache.size == 8
+
+
+def test_remember_reuses_results_for_the_same_content(monkeypatch):
+    monkeypatch.setattr(warm_cache, 'results', TTLCache(ttl=60, max_bytes=1024))
+    calls = []
+
+    def compute(content):
+        calls.append(content)
+        return [content.upper()]
+
+    assert remember('https://a.example/', 'one', 'general', lambda: compute('one')) == ['ONE']
+    assert remember('https://a.example/', 'one', 'general', lambda: compute('one')) == ['ONE']
+    assert remember('https://a.example/', b'two', 'general', lambda: compute(b'two')) == [b'TWO']
+    assert remember('https://a.example/', 'one', 'points', lambda: compute('one')) == ['ONE']
+    assert calls == ['one', b'two', 'one']
@@ -7,3 +7,17 @@ OUTPUT_DIRNAME='outputs'
 OUTPUT_DIR = os.path.join(BASE_DIR, OUTPUT_DIRNAME)
 
 HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:78.0) Gecko/20100101 Firefox/78.0'}
+
+# Conditional-GET cache of fetched pages.  Lambda can only write to /tmp.
+FETCH_CACHE_ENABLED = os.environ.get('SCRAPER_FETCH_CACHE', 'on') != 'off'
+FETCH_CACHE_DIR = os.environ.get(
+    'SCRAPER_FETCH_CACHE_DIR',
+    '/tmp/scraper-fetch-cache' if 'AWS_LAMBDA_FUNCTION_NAME' in os.environ
+    else os.path.join(BASE_DIR, '.cache', 'fetch'),
+)
+
+# In-memory cache of fetched bodies and extracted results, reused by warm
+# Lambda invocations for this many seconds, up to this many megabytes each.
+WARM_CACHE_ENABLED = os.environ.get('SCRAPER_WARM_CACHE', 'on') != 'off'
+WARM_CACHE_TTL = float(os.environ.get('SCRAPER_WARM_CACHE_TTL', '300'))
+WARM_CACHE_MAX_BYTES = int(float(os.environ.get('SCRAPER_WARM_CACHE_MB', '32')) * 1024 * 1024)
@@ -0,0 +1,93 @@
+"""
+Latitude and longitude out of Google Maps links, in one regex pass.
+
+Understood forms, most precise first:
+
+- `.../data=...!3d50.58!4d24.03`: the place's pin.
+- `...?q=50.58,24.03` (also `query=`, `ll=`, `destination=`, `daddr=`).
+- `.../dir//50.58,24.03`: a path segment that is just the coordinates.
+- `.../@50.58,24.03,17z/...`: where the map was centered.
+
+Coordinates out of range are ignored.  With `text=True`, the extractors
+return the coordinates as they're written in the link instead of floats.
+"""
+
+import re
+
+_NUMBER = r"[-+]?\d{1,3}(?:\.\d+)?"
+_COMMA = r"\s*(?:,|%2C)\s*"
+
+_PIN = re.compile(rf"!3d(?P<pin_lat>{_NUMBER})!4d(?P<pin_lon>{_NUMBER})")
+
+_COORDINATES = re.compile(
+    rf"{_PIN.pattern}"
+    rf"|[?&](?:q|query|ll|destination|daddr)=(?:loc:)?(?P<query_lat>{_NUMBER}){_COMMA}(?P<query_lon>{_NUMBER})"
+    rf"|/(?P<path_lat>{_NUMBER}){_COMMA}(?P<path_lon>{_NUMBER})(?=[/?#]|$)"
+    rf"|@(?P<view_lat>{_NUMBER}),(?P<view_lon>{_NUMBER})",
+    re.IGNORECASE,
+)
+
+# Match groups by precedence: lower wins.
+_PRECEDENCE = {"pin_lat": 0, "query_lat": 1, "path_lat": 2, "view_lat": 3}
+
+
+def _valid(lat, lon):
+    return -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0
+
+
+def _result(lat, lon, lat_text, lon_text, text):
+    return (lat_text, lon_text) if text else (lat, lon)
+
+
+def extract_pin(url, text=False):
+    """
+    Returns `(lat, lon)` floats of the place `url` is pinned to, or None.
+
+    Only the `!3d...!4d...` form counts, which a link to a place always has:
+    use it to tell place links from others, which may still hold coordinates.
+    """
+    start = url.find("!3d")
+    while start != -1:
+        match = _PIN.match(url, start)
+        if match:
+            lat, lon = float(match.group(1)), float(match.group(2))
+            if _valid(lat, lon):
+                return _result(lat, lon, match.group(1), match.group(2), text)
+        start = url.find("!3d", start + 3)
+    return None
+
+
+def extract(url, text=False):
+    """Returns `(lat, lon)` floats from a Google Maps `url`, or None if it has none."""
+    # Most links are to a place: go straight to its pin.
+    pin = extract_pin(url, text)
+    if pin is not None:
+        return pin
+
+    best = None
+    best_rank = len(_PRECEDENCE)
+    for match in _COORDINATES.finditer(url):
+        group = match.lastgroup
+        # `lastgroup` names the longitude; its latitude is the group before it.
+        lat_group = group[:-3] + "lat"
+        rank = _PRECEDENCE[lat_group]
+        if rank >= best_rank:
+            continue
+        lat, lon = float(match.group(lat_group)), float(match.group(group))
+        if not _valid(lat, lon):
+            continue
+        best, best_rank = _result(lat, lon, match.group(lat_group), match.group(group), text), rank
+        if rank == 0:
+            break
+    return best
+
+
+def extract_many(urls, text=False):
+    """Returns `extract` of every URL in `urls`, in order, parsing repeated URLs once."""
+    seen = {}
+    results = []
+    for url in urls:
+        if url not in seen:
+            seen[url] = extract(url, text)
+        results.append(seen[url])
+    return results
@@ -0,0 +1,106 @@
+"""
+Change sets between two versions of a country's DynamoDB item.
+
+    {"general": {"added": ["..."], "removed": ["..."]},
+     "reception": {"added": [{...}], "removed": [{...}],
+                   "modified": [{"name": "...", "fields": {"lat": ["46.1", "46.2"]}}]},
+     "source": ["old", "new"]}
+
+Only the parts that changed are present, so an empty dict means nothing did.
+A list that only changed order is marked `{"reordered": true}`.
+Reception points are matched by name (and, for repeated names, by which
+occurrence they are).
+"""
+
+import json
+from dataclasses import dataclass, field
+
+# Attributes a change set covers, in item order.
+CONTENT_ATTRIBUTES = ("general", "reception", "source")
+
+
+def _lines(item):
+    return [value["S"] for value in item.get("general", {}).get("L", [])]
+
+
+def _points(item):
+    return [
+        {key: value["S"] for key, value in point["M"].items()}
+        for point in item.get("reception", {}).get("L", [])
+    ]
+
+
+def _source(item):
+    return item.get("source", {}).get("S", "")
+
+
+def _by_name(points):
+    keyed = {}
+    occurrences = {}
+    for point in points:
+        name = point.get("name", "")
+        occurrence = occurrences[name] = occurrences.get(name, -1) + 1
+        keyed[(name, occurrence)] = point
+    return keyed
+
+
+@dataclass
+class ChangeSet:
+    country: str
+    # Top-level attributes whose value differs, even if only in order.
+    attributes: list = field(default_factory=list)
+    changes: dict = field(default_factory=dict)
+
+    def __bool__(self):
+        return bool(self.attributes)
+
+    def counts(self):
+        """Returns how many lines and points were added, removed and modified."""
+        return {
+            f"{attribute}_{kind}": len(entries)
+            for attribute in ("general", "reception")
+            for kind, entries in self.changes.get(attribute, {}).items()
+            if kind != "reordered"
+        }
+
+    def to_json(self):
+        return json.dumps(self.changes, ensure_ascii=False, separators=(",", ":"))
+
+
+def diff_items(old, new):
+    """Returns the `ChangeSet` that turns item `old` into item `new`."""
+    changes = {}
+    attributes = [name for name in CONTENT_ATTRIBUTES if old.get(name) != new.get(name)]
+
+    if "general" in attributes:
+        old_lines, new_lines = _lines(old), _lines(new)
+        old_set, new_set = set(old_lines), set(new_lines)
+        general = {
+            "added": [line for line in new_lines if line not in old_set],
+            "removed": [line for line in old_lines if line not in new_set],
+        }
+        changes["general"] = {kind: lines for kind, lines in general.items() if lines} or {"reordered": True}
+
+    if "reception" in attributes:
+        old_points, new_points = _by_name(_points(old)), _by_name(_points(new))
+        modified = []
+        for key in new_points.keys() & old_points.keys():
+            before, after = old_points[key], new_points[key]
+            fields = {
+                name: [before.get(name, ""), after.get(name, "")]
+                for name in dict.fromkeys([*after, *before])
+                if before.get(name, "") != after.get(name, "")
+            }
+            if fields:
+                modified.append({"name": key[0], "fields": fields})
+        reception = {
+            "added": [point for key, point in new_points.items() if key not in old_points],
+            "removed": [point for key, point in old_points.items() if key not in new_points],
+            "modified": sorted(modified, key=lambda change: change["name"]),
+        }
+        changes["reception"] = {kind: points for kind, points in reception.items() if points} or {"reordered": True}
+
+    if "source" in attributes:
+        changes["source"] = [_source(old), _source(new)]
+
+    return ChangeSet(new["country"]["S"], attributes, changes)
@@ -1,13 +1,155 @@
 """Functionality related to DynamoDB."""
 
-import boto3
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+from botocore.exceptions import ClientError
+
+from utils.diff import CONTENT_ATTRIBUTES, diff_items
+from utils.fetch import commit as commit_sources
+from utils.postprocess import clean_general
+from utils.reception import as_dynamo
+from utils.timing import stage
+
 TABLE_NAME = "TechForUkraine-CIG"
 
-client = boto3.client("dynamodb", region_name="us-east-1")
+# What to do when a country's content matches the stored item: "touch" only
+# refreshes the timestamps, "skip" writes nothing at all.
+UNCHANGED_POLICY = os.environ.get("DYNAMO_UNCHANGED_POLICY", "touch")
+
+# How changed content is written: "put" replaces the whole item, "update"
+# diffs it against the last snapshot and only sets the attributes that
+# changed, plus a `changes` attribute holding the change set.
+WRITE_MODE = os.environ.get("DYNAMO_WRITE_MODE", "put")
+
+# Created on first use by `get_client`, so importing this module stays cheap.
+client = None
+
+# Content hash last written per country, so warm invocations can tell the
+# content is unchanged without a round trip.
+_last_hashes = {}
+
+# Item last read or written per country, diffed against in "update" mode.
+_snapshots = {}
+
+# Most put requests BatchWriteItem accepts in one call.
+BATCH_SIZE = 25
+
+# Most keys BatchGetItem accepts in one call.
+GET_BATCH_SIZE = 100
+
+# The `WriteBuffer` collecting this run's items, if writes are batched.
+_buffer = None
+
+# Arguments of the `write_to_dynamo` and `touch` calls made inside `capture_writes`.
+_captured = None
+
+
+def get_client():
+    """Returns the DynamoDB client, creating it on first use."""
+    global client
+    if client is None:
+        import boto3
+        client = boto3.client("dynamodb", region_name="us-east-1")
+    return client
+
+
+def content_hash(general_list: list, reception_list: list, source: str) -> str:
+    """Stable fingerprint of an item's content, ignoring its timestamps."""
+    payload = json.dumps(
+        {"general": general_list, "reception": reception_list, "source": source},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _timestamps():
+    """The `isoFormat` and `dateTime` strings of an item written now."""
+    now = datetime.now()
+    return now.isoformat(), now.strftime('%Y-%m-%d  %X  %z')
+
+
+def _touch(country: str, isoString: str, dateTimeString: str, dynamo_client=None):
+    """Refreshes only the timestamps of an item whose content didn't change."""
+    (dynamo_client or get_client()).update_item(
+        TableName = TABLE_NAME,
+        Key = { "country": { "S": country } },
+        UpdateExpression = "SET #iso = :iso, #dt = :dt",
+        ExpressionAttributeNames = { "#iso": "isoFormat", "#dt": "dateTime" },
+        ExpressionAttributeValues = {
+            ":iso": { "S": isoString },
+            ":dt": { "S": dateTimeString }
+        })
 
-def write_to_dynamo(country: str, event: object, general: list, reception: list, source: str):
+def load_snapshot(country: str):
+    """
+    Returns the stored content of `country`'s item, from memory or DynamoDB.
+
+    Returns None if there's no item, or if it has no `contentHash` to make
+    an update conditional on, like items written before hashes were stored.
+    """
+    if country not in _snapshots:
+        names = { f"#{attribute}": attribute for attribute in (*CONTENT_ATTRIBUTES, "contentHash") }
+        response = get_client().get_item(
+            TableName = TABLE_NAME,
+            Key = { "country": { "S": country } },
+            ProjectionExpression = ", ".join(names),
+            ExpressionAttributeNames = names)
+        if "contentHash" not in response.get("Item", {}):
+            return None
+        _snapshots[country] = { "country": { "S": country }, **response["Item"] }
+    return _snapshots[country]
+
+
+def _update(item: dict, snapshot: dict, changes) -> bool:
+    """
+    Sets only the attributes of `item` that `changes` lists, with the new hash, timestamps and change set.
+
+    Returns False, writing nothing, if the stored item is no longer `snapshot`.
+    """
+    assignments = [*changes.attributes, "contentHash", "isoFormat", "dateTime"]
+    values = { f":{attribute}": item[attribute] for attribute in assignments }
+    values[":changes"] = { "S": changes.to_json() }
+    values[":previous"] = snapshot["contentHash"]
+    names = { f"#{attribute}": attribute for attribute in (*assignments, "changes") }
+    try:
+        get_client().update_item(
+            TableName = TABLE_NAME,
+            Key = { "country": item["country"] },
+            UpdateExpression = "SET " + ", ".join(f"#{name} = :{name}" for name in (*assignments, "changes")),
+            ConditionExpression = "#contentHash = :previous",
+            ExpressionAttributeNames = names,
+            ExpressionAttributeValues = values)
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+    return True
+
+
+def _remember(item: dict):
+    _last_hashes[item["country"]["S"]] = item["contentHash"]["S"]
+    if WRITE_MODE == "update":
+        _snapshots[item["country"]["S"]] = item
+
+
+def destination(country: str, event: object) -> str:
+    """The key of the item `country` is written to for `event`."""
+    #######################################################################################################################################
+    # USED FOR TESTING IN LAMBDA. Include 'testSuffix' in your lambda test object so that the dynamo items used in prod are not overwritten
+    if event != "" and 'testSuffix' in event:
+        country += event["testSuffix"]
+    #######################################################################################################################################
+    return country
+
+
+def write_to_dynamo(country: str, event: object, general: list, reception: list, source: str, sources: dict = None):
     """
     Write the data to DynamoDB.
 
@@ -15,46 +157,253 @@ def write_to_dynamo(country: str, event: object, general: list, reception: list,
         country (str): The name of the country.
         general (list[str]): More general information.
         reception (list): Border crossing points.
+        sources (dict): `utils.fetch.versions` of the pages the content came
+            from, committed once the write succeeded so later runs can skip
+            while they don't change.
+
+    Unchanged content (same `content_hash` as the stored item) isn't
+    rewritten; see `UNCHANGED_POLICY`.  In "update" `WRITE_MODE`, changed
+    content only rewrites the attributes that changed.
+
+    Returns:
+        ChangeSet: What changed, when it was written in "update" mode, else None.
     """
+    if _captured is not None:
+        _captured.append((country, event, general, reception, source, sources))
+        return None
 
-    #######################################################################################################################################
-    # USED FOR TESTING IN LAMBDA. Include 'testSuffix' in your lambda test object so that the dynamo items used in prod are not overwritten
-    if event != "":
-        testSuffix = "" if ('testSuffix' not in event) else event["testSuffix"]
-        country += testSuffix
-    #######################################################################################################################################
+    country = destination(country, event)
+    with stage("write", country=country) as record:
+        changes = _write(country, general, reception, source, record, sources)
+        if record["action"] != "buffered":
+            commit_sources(country, sources)
+        return changes
 
-    now = datetime.now()
-    dateTimeString = now.strftime('%Y-%m-%d  %X  %z')
-    isoString = now.isoformat()
+
+def touch(country: str, event: object):
+    """
+    Handles `country`'s item as unchanged content, see `UNCHANGED_POLICY`,
+    for a scraper that found none of its sources changed and so has no
+    content to pass to `write_to_dynamo`.
+    """
+    if _captured is not None:
+        _captured.append((country, event))
+        return
+
+    country = destination(country, event)
+    with stage("write", country=country, action=UNCHANGED_POLICY):
+        if UNCHANGED_POLICY == "touch":
+            _touch(country, *_timestamps())
+
+
+def replay(args: tuple):
+    """Makes a call recorded by `capture_writes`: `touch` for 2 arguments, else `write_to_dynamo`."""
+    if len(args) == 2:
+        touch(*args)
+    else:
+        write_to_dynamo(*args)
+
+
+def _write(country: str, general: list, reception: list, source: str, record: dict, sources: dict = None):
+    """Does the work of `write_to_dynamo`, noting what it did in the timing `record`."""
+    isoString, dateTimeString = _timestamps()
 
     # Remove duplicate strings and create entries into the 'general' attribute of the dynamo item/object
-    uniqueGeneralList = []
-    general_list = []
-    for line in general:
-        if line not in uniqueGeneralList:
-            uniqueGeneralList.append(line)
-            general_list.append({ "S": line })
-
-    reception_list = []
-    for rec in reception:
-        reception_list.append({
-            "M": {
-                "name": { "S": rec.name },
-                "lat": { "S": rec.lat },
-                "lon": { "S": rec.lon },
-                "address": { "S": rec.address },
-                "qr": { "S": rec.qr }
-            }
-        })
+    general_list = [{ "S": line } for line in clean_general(general)]
 
-    client.put_item(
-        TableName = TABLE_NAME,
-        Item = {
-            "country": { "S": country },
-            "general": { "L": general_list },
-            "reception": { "L": reception_list },
-            "source": { "S": source },
-            "isoFormat": { "S": isoString },
-            "dateTime": { "S": dateTimeString }
-        })
+    reception_list = as_dynamo(reception)
+
+    fingerprint = content_hash(general_list, reception_list, source)
+    item = {
+        "country": { "S": country },
+        "general": { "L": general_list },
+        "reception": { "L": reception_list },
+        "source": { "S": source },
+        "contentHash": { "S": fingerprint },
+        "isoFormat": { "S": isoString },
+        "dateTime": { "S": dateTimeString }
+    }
+    snapshot = load_snapshot(country) if WRITE_MODE == "update" else None
+    if snapshot is not None:
+        _last_hashes[country] = snapshot["contentHash"]["S"]
+    unchanged = _last_hashes.get(country) == fingerprint
+    record["bytes"] = len(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+
+    # UpdateItem can't be batched, so this doesn't wait for the buffer.
+    if snapshot is not None and not unchanged:
+        changes = diff_items(snapshot, item)
+        if _update(item, snapshot, changes):
+            record["action"] = "update"
+            record["bytes"] = len(json.dumps({ name: item[name] for name in changes.attributes }, ensure_ascii=False).encode("utf-8"))
+            record.update(changes.counts())
+            _remember(item)
+            return changes
+        # Someone else wrote the item since the snapshot: replace it whole.
+        del _snapshots[country]
+
+    if _buffer is not None and not unchanged:
+        # BatchWriteItem can't be conditional: the buffer checks the stored
+        # hashes it doesn't know yet before putting anything.
+        _buffer.add(item, sources)
+        record["action"] = "buffered"
+        return None
+
+    if unchanged:
+        if UNCHANGED_POLICY == "touch":
+            _touch(country, isoString, dateTimeString)
+        record["action"] = UNCHANGED_POLICY
+        return None
+
+    # Only replace the item if its content hash differs from the stored one.
+    try:
+        get_client().put_item(
+            TableName = TABLE_NAME,
+            Item = item,
+            ConditionExpression = "attribute_not_exists(contentHash) OR contentHash <> :hash",
+            ExpressionAttributeValues = { ":hash": { "S": fingerprint } })
+        record["action"] = "put"
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        if UNCHANGED_POLICY == "touch":
+            _touch(country, isoString, dateTimeString)
+        record["action"] = UNCHANGED_POLICY
+    _remember(item)
+    return None
+
+
+class WriteBuffer:
+    """
+    Collects items from every scraper in a run and writes them with BatchWriteItem.
+
+    Only items whose content changed are put, since a batched put can't be
+    conditional: the stored hashes not known from an earlier write are read
+    first with BatchGetItem, and items matching them are handled as
+    unchanged (see `UNCHANGED_POLICY`) instead.
+
+    Items are sent in chunks of `BATCH_SIZE`.  Whatever DynamoDB hands back as
+    `UnprocessedItems` or `UnprocessedKeys` is retried with exponential
+    backoff, up to `max_retries` times per chunk.
+    """
+
+    def __init__(self, dynamo_client=None, table_name=TABLE_NAME, max_retries=5, base_delay=0.05, sleep=time.sleep):
+        self.client = dynamo_client
+        self.table_name = table_name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.sleep = sleep
+        # Keyed by country: one batch can't hold two puts for the same key.
+        self.items = {}
+        # Country -> the `sources` to commit once its item is written.
+        self.sources = {}
+
+    def add(self, item: dict, sources: dict = None):
+        """Queues `item`, replacing any earlier item for the same country."""
+        self.items[item["country"]["S"]] = item
+        self.sources[item["country"]["S"]] = sources
+
+    def flush(self):
+        """Writes all queued items.  Raises RuntimeError if some never got processed."""
+        if not self.items:
+            return
+        dynamo_client = self.client if self.client is not None else get_client()
+        items = list(self.items.values())
+        sources = self.sources
+        self.items = {}
+        self.sources = {}
+        with stage("flush", items=len(items)) as record:
+            items = self._changed(dynamo_client, items, sources)
+            record["changed"] = len(items)
+            for start in range(0, len(items), BATCH_SIZE):
+                chunk = items[start:start + BATCH_SIZE]
+                self._write_chunk(dynamo_client, chunk)
+                for item in chunk:
+                    _remember(item)
+                    commit_sources(item["country"]["S"], sources.get(item["country"]["S"]))
+
+    def _changed(self, dynamo_client, items, sources):
+        """Returns the `items` whose content differs from the stored item, touching the others."""
+        unknown = [item["country"] for item in items if item["country"]["S"] not in _last_hashes]
+        for start in range(0, len(unknown), GET_BATCH_SIZE):
+            for country, fingerprint in self._read_hashes(dynamo_client, unknown[start:start + GET_BATCH_SIZE]).items():
+                _last_hashes[country] = fingerprint
+        changed = []
+        for item in items:
+            country = item["country"]["S"]
+            if _last_hashes.get(country) != item["contentHash"]["S"]:
+                changed.append(item)
+            else:
+                if UNCHANGED_POLICY == "touch":
+                    _touch(country, item["isoFormat"]["S"], item["dateTime"]["S"], dynamo_client)
+                commit_sources(country, sources.get(country))
+        return changed
+
+    def _read_hashes(self, dynamo_client, keys):
+        """Returns the stored `contentHash` of the items with these `keys`, by country."""
+        request = { self.table_name: {
+            "Keys": [{ "country": key } for key in keys],
+            "ProjectionExpression": "country, contentHash",
+        } }
+        hashes = {}
+        for attempt in range(self.max_retries + 1):
+            response = dynamo_client.batch_get_item(RequestItems = request)
+            for item in response.get("Responses", {}).get(self.table_name, []):
+                if "contentHash" in item:
+                    hashes[item["country"]["S"]] = item["contentHash"]["S"]
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                return hashes
+            if attempt < self.max_retries:
+                self.sleep(self.base_delay * 2 ** attempt)
+        unprocessed = sum(len(keys["Keys"]) for keys in request.values())
+        raise RuntimeError(f"{unprocessed} keys still unprocessed after {self.max_retries} retries")
+
+    def _write_chunk(self, dynamo_client, chunk):
+        request = { self.table_name: [{ "PutRequest": { "Item": item } } for item in chunk] }
+        for attempt in range(self.max_retries + 1):
+            response = dynamo_client.batch_write_item(RequestItems = request)
+            request = response.get("UnprocessedItems") or {}
+            if not request:
+                return
+            if attempt < self.max_retries:
+                self.sleep(self.base_delay * 2 ** attempt)
+        unprocessed = sum(len(requests) for requests in request.values())
+        raise RuntimeError(f"{unprocessed} items still unprocessed after {self.max_retries} retries")
+
+
+@contextmanager
+def batch_writes(dynamo_client=None):
+    """
+    Buffers every `write_to_dynamo` inside the block and flushes them together on exit.
+
+    Nested blocks join the outermost one, which does the only flush.
+    """
+    global _buffer
+    if _buffer is not None:
+        yield _buffer
+        return
+    previous = _buffer
+    buffer = _buffer = WriteBuffer(dynamo_client)
+    try:
+        yield buffer
+    finally:
+        # Flush even if the block failed: the other scrapers' items are still good.
+        _buffer = previous
+        buffer.flush()
+
+
+@contextmanager
+def capture_writes():
+    """
+    Records every `write_to_dynamo` and `touch` call inside the block instead of writing.
+
+    Yields the list of recorded argument tuples, which can be sent to another
+    process and replayed there with `replay(args)`.
+    """
+    global _captured
+    previous = _captured
+    captured = _captured = []
+    try:
+        yield captured
+    finally:
+        _captured = previous
@@ -0,0 +1,110 @@
+"""In-memory stand-in for the DynamoDB client, for tests and local runs."""
+
+import copy
+import re
+
+from botocore.exceptions import ClientError
+
+_SET_CLAUSE = re.compile(r"\s*(#?\w+)\s*=\s*(:\w+)\s*")
+
+
+class LocalDynamoClient:
+    """
+    Implements the slice of the boto3 DynamoDB client that `utils.dynamo` uses.
+
+    Items are kept per table, keyed by their `country`.  `max_batch_items`
+    simulates throttling: each `batch_write_item` call processes at most that
+    many puts and returns the rest as `UnprocessedItems`.
+    """
+
+    def __init__(self, max_batch_items=None):
+        self.tables = {}
+        self.max_batch_items = max_batch_items
+        self.calls = []
+
+    def _table(self, name):
+        return self.tables.setdefault(name, {})
+
+    def get_item(self, TableName, Key, ProjectionExpression=None, ExpressionAttributeNames=None):
+        self.calls.append("get_item")
+        item = self._table(TableName).get(Key["country"]["S"])
+        if item is None:
+            return {}
+        if ProjectionExpression is not None:
+            names = ExpressionAttributeNames or {}
+            wanted = [names.get(name.strip(), name.strip()) for name in ProjectionExpression.split(",")]
+            item = { name: item[name] for name in wanted if name in item }
+        return { "Item": copy.deepcopy(item) }
+
+    def put_item(self, TableName, Item, ConditionExpression=None, ExpressionAttributeValues=None):
+        self.calls.append("put_item")
+        table = self._table(TableName)
+        country = Item["country"]["S"]
+        if ConditionExpression is not None:
+            stored = table.get(country, {}).get("contentHash")
+            # Only the condition `write_to_dynamo` uses is understood.
+            if stored is not None and stored == ExpressionAttributeValues[":hash"]:
+                raise ClientError(
+                    { "Error": { "Code": "ConditionalCheckFailedException", "Message": "The conditional request failed" } },
+                    "PutItem")
+        table[country] = copy.deepcopy(Item)
+        return {}
+
+    def update_item(self, TableName, Key, UpdateExpression, ExpressionAttributeValues, ExpressionAttributeNames=None, ConditionExpression=None):
+        self.calls.append("update_item")
+        names = ExpressionAttributeNames or {}
+        table = self._table(TableName)
+        if ConditionExpression is not None:
+            # Only a single `name = :value` equality is understood.
+            name, value = _SET_CLAUSE.fullmatch(ConditionExpression).groups()
+            stored = table.get(Key["country"]["S"], {}).get(names.get(name, name))
+            if stored != ExpressionAttributeValues[value]:
+                raise ClientError(
+                    { "Error": { "Code": "ConditionalCheckFailedException", "Message": "The conditional request failed" } },
+                    "UpdateItem")
+        item = table.setdefault(Key["country"]["S"], copy.deepcopy(Key))
+        action, _, clauses = UpdateExpression.strip().partition(" ")
+        if action.upper() != "SET":
+            raise NotImplementedError(UpdateExpression)
+        for clause in clauses.split(","):
+            name, value = _SET_CLAUSE.fullmatch(clause).groups()
+            item[names.get(name, name)] = copy.deepcopy(ExpressionAttributeValues[value])
+        return {}
+
+    def batch_get_item(self, RequestItems):
+        self.calls.append("batch_get_item")
+        responses = {}
+        for table_name, request in RequestItems.items():
+            if len(request["Keys"]) > 100:
+                raise ClientError(
+                    { "Error": { "Code": "ValidationException", "Message": "Too many items requested for the BatchGetItem call" } },
+                    "BatchGetItem")
+            # Only plain attribute names are understood in the projection.
+            wanted = [name.strip() for name in request.get("ProjectionExpression", "").split(",") if name.strip()]
+            found = responses.setdefault(table_name, [])
+            for key in request["Keys"]:
+                item = self._table(table_name).get(key["country"]["S"])
+                if item is not None:
+                    if wanted:
+                        item = { name: item[name] for name in wanted if name in item }
+                    found.append(copy.deepcopy(item))
+        return { "Responses": responses, "UnprocessedKeys": {} }
+
+    def batch_write_item(self, RequestItems):
+        self.calls.append("batch_write_item")
+        budget = self.max_batch_items
+        unprocessed = {}
+        for table_name, requests in RequestItems.items():
+            if len(requests) > 25:
+                raise ClientError(
+                    { "Error": { "Code": "ValidationException", "Message": "Too many items requested for the BatchWriteItem call" } },
+                    "BatchWriteItem")
+            for request in requests:
+                if budget is not None and budget <= 0:
+                    unprocessed.setdefault(table_name, []).append(request)
+                    continue
+                item = request["PutRequest"]["Item"]
+                self._table(table_name)[item["country"]["S"]] = copy.deepcopy(item)
+                if budget is not None:
+                    budget -= 1
+        return { "UnprocessedItems": unprocessed }
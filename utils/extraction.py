@@ -0,0 +1,67 @@
+"""
+Declarative extraction of text lines from parsed pages.
+
+A scraper describes what it wants as a `LineSpec` at module level, so the
+CSS selectors are compiled once, when the module is imported:
+
+    HUNGARY_GENERAL = LineSpec("div.field-szovegtorzs.oldal", "p")
+
+`extract_lines` then walks the container once, collecting each item's text.
+"""
+
+import re
+
+import soupsieve
+
+# Selectors that are only a tag name, which BeautifulSoup's own `find_all`
+# matches several times faster than soupsieve does.
+_TAG_ONLY = re.compile(r"[a-zA-Z][a-zA-Z0-9-]*\Z")
+
+
+class LineSpec:
+    """
+    The text of every `items` element inside the first `root` element, in
+    document order.
+
+    With `stop_text`, extraction ends at the first item holding a string
+    exactly equal to it, like a heading announcing the next section.
+    """
+
+    __slots__ = ("root", "items", "item_tag", "stop_text", "separator")
+
+    def __init__(self, root, items, stop_text=None, separator=" "):
+        self.root = soupsieve.compile(root)
+        self.items = soupsieve.compile(items)
+        self.item_tag = items.lower() if _TAG_ONLY.match(items) else None
+        self.stop_text = stop_text
+        self.separator = separator
+
+    def __repr__(self):
+        return f"LineSpec({self.root.pattern!r}, {self.items.pattern!r}, stop_text={self.stop_text!r})"
+
+
+def extract_lines(spec, soup):
+    """
+    Returns the lines `spec` describes in `soup`, each item's strings
+    stripped and joined like `get_text(strip=True, separator=...)`.
+
+    Raises ValueError if nothing in `soup` matches the spec's root.
+    """
+    root = spec.root.select_one(soup)
+    if root is None:
+        raise ValueError(f"Nothing matches {spec.root.pattern!r}")
+    stop_text = spec.stop_text
+    join = spec.separator.join
+    lines = []
+    items = root.find_all(spec.item_tag) if spec.item_tag else spec.items.iselect(root)
+    for item in items:
+        parts = []
+        for string in item.strings:
+            # One pass over the item's strings both finds the stop marker and builds the line.
+            if string == stop_text:
+                return lines
+            string = string.strip()
+            if string:
+                parts.append(string)
+        lines.append(join(parts))
+    return lines
@@ -0,0 +1,303 @@
+"""Concurrent fetching of source pages and KML files."""
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from utils import warm_cache
+from utils.constants import FETCH_CACHE_DIR, FETCH_CACHE_ENABLED, HEADERS
+from utils.fetch_cache import FetchCache
+from utils.policy import policy
+from utils.timing import paused, stage
+from utils.transport import get_transport
+
+# Maximum number of requests in flight against a single host.
+PER_HOST_LIMIT = 3
+
+# Bytes read off the socket at a time by `fetch_chunks`.
+CHUNK_SIZE = 64 * 1024
+
+# Validators and bodies of previous fetches, or None when caching is off.
+cache = FetchCache(FETCH_CACHE_DIR) if FETCH_CACHE_ENABLED else None
+
+# Results fetched ahead of time by `prefetch`, consumed by `fetch`.
+_prefetched = {}
+
+# Streams `unchanged` started, consumed by `fetch_chunks`.
+_streams = {}
+
+# URL -> content hash of the body last fetched from it, see `versions`.
+_versions = {}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    content: bytes
+    # True when the server answered 304 and `content` came from the cache.
+    not_modified: bool = False
+
+
+def _cached(url, headers):
+    """Returns the cache entry for `url` and `headers` with its validators added."""
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        headers = {**headers, **cached.validators()}
+    return cached, headers
+
+
+def _warm(url):
+    """Returns the body of `url` fetched within the warm cache's TTL, or None."""
+    return warm_cache.body(url)
+
+
+def _keep_warm(url, body):
+    if warm_cache.bodies is not None:
+        warm_cache.bodies.put(url, body, len(body))
+
+
+def _store(url, response, body):
+    if cache is not None and response.status_code == 200:
+        cache.store(
+            url,
+            body,
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+        )
+
+
+def _fetched(result):
+    """Notes the version of a fetched body, and returns `result`."""
+    _versions[result.url] = warm_cache.content_hash(result.content)
+    return result
+
+
+def _get(url, headers):
+    warm = _warm(url)
+    if warm is not None:
+        with stage("fetch", url=url, warm=True, bytes=len(warm)):
+            return _fetched(FetchResult(url, warm))
+    with stage("fetch", url=url) as record:
+        cached, headers = _cached(url, headers)
+        response = policy.get(get_transport(), url, headers, record=record)
+        record["status"] = response.status_code
+        if response.status_code == 304 and cached is not None:
+            _keep_warm(url, cached.body)
+            return _fetched(FetchResult(url, cached.body, not_modified=True))
+        record["bytes"] = len(response.content)
+        _store(url, response, response.content)
+        if response.status_code == 200:
+            _keep_warm(url, response.content)
+        return _fetched(FetchResult(url, response.content))
+
+
+async def fetch_async(url, headers=HEADERS, semaphore=None):
+    """Fetches a single URL without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    if semaphore is None:
+        return await loop.run_in_executor(None, _get, url, headers)
+    async with semaphore:
+        return await loop.run_in_executor(None, _get, url, headers)
+
+
+async def fetch_all_async(urls, headers=HEADERS, per_host_limit=PER_HOST_LIMIT):
+    """
+    Fetches all URLs concurrently, at most `per_host_limit` at a time per host.
+
+    Returns:
+        dict: URL to `FetchResult`, or to the exception raised while fetching it.
+    """
+    urls = list(dict.fromkeys(urls))
+    semaphores = {}
+    for url in urls:
+        host = urlsplit(url).netloc
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(per_host_limit)
+
+    results = await asyncio.gather(
+        *(fetch_async(url, headers, semaphores[urlsplit(url).netloc]) for url in urls),
+        return_exceptions=True,
+    )
+    return dict(zip(urls, results))
+
+
+def fetch_all(urls, headers=HEADERS, per_host_limit=PER_HOST_LIMIT):
+    """Synchronous facade for `fetch_all_async`."""
+    return asyncio.run(fetch_all_async(urls, headers, per_host_limit))
+
+
+def prefetch(urls, headers=HEADERS):
+    """
+    Downloads all URLs concurrently so later `fetch` calls return immediately.
+
+    Failures are logged and left for `fetch` to retry, so the scraper that
+    owns the URL reports the error as it would have without prefetching.
+    """
+    for url, result in fetch_all(urls, headers).items():
+        if isinstance(result, Exception):
+            logging.warning("Prefetching %s failed: %s", url, result)
+        else:
+            _prefetched[url] = result
+
+
+def take_prefetched(urls):
+    """
+    Removes and returns URL -> prefetched `FetchResult` for those of `urls`
+    that were prefetched, e.g. to hand them to another process, which passes
+    them to `seed_prefetched`.
+    """
+    return {url: _prefetched.pop(url) for url in urls if url in _prefetched}
+
+
+def seed_prefetched(results):
+    """Makes URL -> `FetchResult` `results` serve the following fetches, as if prefetched here."""
+    for url, result in results.items():
+        _prefetched[url] = _fetched(result)
+
+
+def fetch_result(url, headers=HEADERS):
+    """Returns the `FetchResult` for `url`, using a prefetched one if there is one."""
+    if url in _prefetched:
+        return _prefetched.pop(url)
+    return _get(url, headers)
+
+
+def fetch(url, headers=HEADERS):
+    """Returns the body of `url`, using a prefetched copy if there is one."""
+    return fetch_result(url, headers).content
+
+
+def fetch_chunks(url, headers=HEADERS, chunk_size=CHUNK_SIZE):
+    """
+    Yields the body of `url` in chunks, as they come off the socket.
+
+    Prefetched, warm and cached bodies are already in memory and come as one
+    chunk.  The logged fetch stage leaves out the time the consumer spends
+    between chunks; see `utils.timing.excluding` for the consumer's side.
+    """
+    if url in _streams:
+        yield from _streams.pop(url)
+        return
+    if url in _prefetched:
+        yield _fetched(_prefetched.pop(url)).content
+        return
+    warm = _warm(url)
+    if warm is not None:
+        with stage("fetch", url=url, streamed=True, warm=True, bytes=len(warm)) as record:
+            _fetched(FetchResult(url, warm))
+            with paused(record):
+                yield warm
+        return
+
+    cached, headers = _cached(url, headers)
+    with stage("fetch", url=url, streamed=True) as record, policy.get(get_transport(), url, headers, stream=True, record=record) as response:
+        record["status"] = response.status_code
+        if response.status_code == 304 and cached is not None:
+            _keep_warm(url, cached.body)
+            _fetched(FetchResult(url, cached.body, not_modified=True))
+            with paused(record):
+                yield cached.body
+            return
+        # The caches need the whole body: the warm cache always, the fetch
+        # cache only if there's a validator to store with it.
+        store = cache is not None and ("ETag" in response.headers or "Last-Modified" in response.headers)
+        warm = warm_cache.bodies is not None and response.status_code == 200
+        keep = store or warm
+        body = []
+        digest = hashlib.sha256()
+        record["bytes"] = 0
+        for chunk in response.iter_content(chunk_size):
+            record["bytes"] += len(chunk)
+            digest.update(chunk)
+            if keep:
+                body.append(chunk)
+            with paused(record):
+                yield chunk
+        # Only a body read to the end has a version.
+        _versions[url] = digest.hexdigest()
+        if keep:
+            body = b"".join(body)
+            if store:
+                _store(url, response, body)
+            if warm:
+                _keep_warm(url, body)
+
+
+def versions(urls):
+    """Returns URL -> content hash of the body last fetched from it, or None if it wasn't."""
+    return {url: _versions.get(url) for url in urls}
+
+
+def commit(destination, sources):
+    """
+    Records that `destination` was written from `sources`, the `versions`
+    of its source URLs, for `unchanged` to compare against.
+
+    Call it once the write succeeded: until then, the next run scrapes again.
+    """
+    if cache is None or not sources or None in sources.values():
+        return
+    cache.commit(destination, sources)
+
+
+def _start(url, headers):
+    """
+    Starts streaming `url` for a later `fetch_chunks`, and returns its
+    version if the first chunk is the whole body (a 304, a warm or a
+    prefetched body), else None.
+    """
+    stale = _streams.pop(url, None)
+    if stale is not None:
+        stale.close()
+    _versions.pop(url, None)
+    chunks = fetch_chunks(url, headers)
+    first = next(chunks, None)
+    _streams[url] = _resume(first, chunks)
+    return _versions.get(url)
+
+
+def _resume(first, chunks):
+    """Yields `first`, if there is one, then the rest of `chunks`."""
+    try:
+        if first is not None:
+            yield first
+        yield from chunks
+    finally:
+        chunks.close()
+
+
+def unchanged(urls, destination, headers=HEADERS, streamed=()):
+    """
+    Tells whether every URL still serves the body `destination` was last
+    written from, see `commit`.
+
+    The results are kept for the following `fetch` calls, so a scraper can
+    check this first and only parse when something changed, without
+    downloading anything twice.  Conditional GETs keep the check cheap.
+
+    The `streamed` URLs, read with `fetch_chunks`, aren't downloaded whole:
+    they are only started, and one whose body doesn't come whole with its
+    first chunk can't be compared, so it counts as changed and its stream
+    is left for `fetch_chunks` to carry on with.
+    """
+    pages = [url for url in urls if url not in streamed]
+    missing = [url for url in pages if url not in _prefetched]
+    if missing:
+        prefetch(missing, headers)
+    if cache is None or not all(url in _prefetched for url in pages):
+        return False
+    committed = cache.committed(destination)
+    if any(committed.get(url) is None or committed.get(url) != _versions.get(url) for url in pages):
+        return False
+    for url in streamed:
+        if url in urls and (committed.get(url) is None or _start(url, headers) != committed[url]):
+            return False
+    # The caller won't fetch these, so don't let them linger.
+    for url in urls:
+        _prefetched.pop(url, None)
+        stream = _streams.pop(url, None)
+        if stream is not None:
+            stream.close()
+    return True
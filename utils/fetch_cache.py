@@ -0,0 +1,93 @@
+"""
+On-disk cache of fetched bodies, revalidated with conditional GETs, and of
+the source versions each item was last written from.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str = ""
+    last_modified: str = ""
+
+    def validators(self):
+        """Request headers that ask the server to answer 304 if nothing changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class FetchCache:
+    """
+    Stores each body next to its `ETag`/`Last-Modified` validators.
+
+    Every URL gets a `<sha256>.body` and a `<sha256>.json` file in `directory`,
+    which is created on first write.  In Lambda this should live under `/tmp`,
+    the only writable path.
+
+    Every destination item also gets a `<sha256>.sources.json` file, with the
+    versions of the sources it was last successfully written from.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".body", base + ".json"
+
+    def _sources_path(self, destination):
+        key = hashlib.sha256(f"destination:{destination}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".sources.json")
+
+    def get(self, url):
+        """Returns the cached `CacheEntry` for `url`, or None."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(body, meta.get("etag", ""), meta.get("last_modified", ""))
+
+    def store(self, url, body, etag="", last_modified=""):
+        """Caches `body` if the server sent a validator; otherwise there's nothing to revalidate with."""
+        if not etag and not last_modified:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        # Write to temporary files first so a concurrent reader never sees half an entry.
+        _write_atomic(body_path, body)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def committed(self, destination):
+        """Returns the source URL -> version `destination` was last written from, or {}."""
+        try:
+            with open(self._sources_path(destination), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def commit(self, destination, sources):
+        """Records that `destination` was written from these source URL -> version."""
+        os.makedirs(self.directory, exist_ok=True)
+        _write_atomic(self._sources_path(destination), json.dumps(sources).encode("utf-8"))
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,91 @@
+"""Streaming reader for Google My Maps KML files."""
+
+from xml.etree.ElementTree import XMLPullParser
+
+from utils.reception import Reception
+from utils.utils import normalize
+
+
+def _local(tag):
+    """Strips the namespace from an ElementTree tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element, name):
+    for child in element:
+        if _local(child.tag) == name:
+            return child.text or ""
+    return None
+
+
+def _coordinates(placemark):
+    for child in placemark:
+        if _local(child.tag) == "Point":
+            return _child_text(child, "coordinates")
+    return None
+
+
+def read_reception_points(
+        chunks,
+        folder_name_whitelist=None,
+        style_urls_blacklist=None,
+):
+    """
+    Yields a `Reception` for every placemark of a KML document, as it's parsed.
+
+    Only placemarks directly inside one of the document's top-level folders
+    are read.  Each element is dropped once handled, so memory use doesn't
+    grow with the size of the map.
+
+    Args:
+        chunks (iterable[bytes]): The document, e.g. from `utils.fetch.fetch_chunks`.
+        folder_name_whitelist (list[str]): Only read folders whose name
+            contains one of these.  None reads every folder.
+        style_urls_blacklist (list[str]): Skip placemarks with these styles.
+    """
+    if style_urls_blacklist is None:
+        style_urls_blacklist = []
+    parser = XMLPullParser(events=("start", "end"))
+    # Open elements, outermost first: kml, Document, Folder, ...
+    path = []
+    # Whether the current top-level folder passed the whitelist; None until its name is known.
+    folder_wanted = None
+
+    def drain():
+        nonlocal folder_wanted
+        for event, element in parser.read_events():
+            tag = _local(element.tag)
+            if event == "start":
+                path.append(element)
+                if tag == "Folder" and len(path) == 3:
+                    folder_wanted = None if folder_name_whitelist is not None else True
+                continue
+
+            path.pop()
+            depth = len(path)
+            if tag == "name" and depth == 3 and _local(path[-1].tag) == "Folder" and folder_wanted is None:
+                folder_name = normalize(element.text or "")
+                folder_wanted = any(value in folder_name for value in folder_name_whitelist)
+            elif tag == "Placemark" and depth == 3 and _local(path[-1].tag) == "Folder":
+                coordinates = _coordinates(element)
+                if (
+                        folder_wanted
+                        and coordinates is not None
+                        and _child_text(element, "styleUrl") not in style_urls_blacklist
+                ):
+                    coord = coordinates.split(',')
+                    yield Reception(
+                        name=normalize(_child_text(element, "name") or ""),
+                        lat=coord[1].strip(),
+                        lon=coord[0].strip(),
+                    )
+
+            # Everything below a folder is handled by now; let it go.
+            if depth <= 3 and depth > 0:
+                path[-1].remove(element)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
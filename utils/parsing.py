@@ -0,0 +1,54 @@
+"""HTML parser backends."""
+
+import codecs
+import logging
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+# BeautifulSoup on top of Python's built-in parser.  Slowest, but always available.
+HTML_PARSER = "html.parser"
+# BeautifulSoup on top of lxml.
+LXML = "lxml"
+# lxml on its own, without building a BeautifulSoup tree.  Returns an
+# `lxml.html.HtmlElement`, so it only suits code written against lxml.
+LXML_DIRECT = "lxml-direct"
+
+PARSERS = (HTML_PARSER, LXML, LXML_DIRECT)
+
+DEFAULT_PARSER = HTML_PARSER
+
+
+def parse_html(content, parser=DEFAULT_PARSER, target=None, encoding=None):
+    """
+    Parses an HTML document with the given backend.
+
+    Args:
+        content (bytes or str): The document.  Text skips encoding detection.
+        parser (str): One of `PARSERS`.
+        target (tuple): Optional `(tag, class)` of the container the caller
+            needs.  BeautifulSoup then only builds the matching elements and
+            their contents, which is much faster and smaller than the whole
+            page.  Ignored by `lxml-direct`.
+        encoding (str): The declared encoding of `content` bytes, so it isn't
+            detected.
+
+    Falls back to `html.parser` when lxml is requested but not installed, so
+    a missing wheel slows scraping down instead of breaking it.
+    """
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser {parser!r}, expected one of {PARSERS}")
+    if parser == LXML_DIRECT:
+        import lxml.html
+        if encoding is not None and isinstance(content, bytes):
+            # libxml2 doesn't know every alias Python does, e.g. "latin-1".
+            encoding = codecs.lookup(encoding).name
+            return lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=encoding))
+        return lxml.html.fromstring(content)
+    if encoding is not None and isinstance(content, bytes):
+        content = content.decode(encoding, errors="replace")
+    parse_only = SoupStrainer(target[0], class_=target[1]) if target else None
+    try:
+        return BeautifulSoup(content, parser, parse_only=parse_only)
+    except FeatureNotFound:
+        logging.warning("Parser %s is not installed, falling back to %s", parser, HTML_PARSER)
+        return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
@@ -0,0 +1,191 @@
+"""
+How every source fetch is made: timeouts, per-host rate limits, retries
+with jittered backoff, and an overall deadline.
+
+The deadline is set from the Lambda context by `deadline_from`, so a
+stalled server fails the fetch instead of running the function out of time.
+"""
+
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+
+# Seconds to wait for a connection, and between bytes of the response.
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+
+# Retries after the first attempt, for connection errors and these statuses.
+MAX_RETRIES = 2
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Backoff before retry n is uniform in [0, min(MAX_BACKOFF, BACKOFF * 2 ** n)].
+BACKOFF = 0.25
+MAX_BACKOFF = 2.0
+
+# Requests per second and burst size allowed per host.
+DEFAULT_RATE = (4.0, 4)
+HOST_RATES = {
+    "www.gov.pl": (6.0, 6),
+}
+
+# Time kept back from the Lambda's remaining time, for writing the results.
+DEADLINE_MARGIN = float(os.environ.get("SCRAPER_DEADLINE_MARGIN_MS", "500")) / 1000
+
+# `time.monotonic()` by which every fetch must be done, or None.
+_deadline = None
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of fetching when the deadline leaves no time for it."""
+
+
+def remaining():
+    """Returns the seconds left until the deadline, or None when there is none."""
+    if _deadline is None:
+        return None
+    return _deadline - time.monotonic()
+
+
+@contextmanager
+def deadline(seconds):
+    """Makes every fetch inside the block finish within `seconds` (None: no deadline)."""
+    global _deadline
+    previous = _deadline
+    _deadline = None if seconds is None else time.monotonic() + seconds
+    try:
+        yield
+    finally:
+        _deadline = previous
+
+
+def deadline_from(context, margin=DEADLINE_MARGIN):
+    """`deadline` of the Lambda `context`'s remaining time, less `margin`; no deadline without a context."""
+    if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return deadline(None)
+    return deadline(max(context.get_remaining_time_in_millis() / 1000 - margin, 0.0))
+
+
+class TokenBucket:
+    """Allows `rate` requests per second, in bursts of up to `burst`."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token, returning how many seconds to wait before using it."""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        """Gives back a token that was reserved but not used."""
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+
+class FetchPolicy:
+    """Applies timeouts, rate limits, retries and the deadline around a transport's `get`."""
+
+    def __init__(
+            self,
+            connect_timeout=CONNECT_TIMEOUT,
+            read_timeout=READ_TIMEOUT,
+            max_retries=MAX_RETRIES,
+            backoff=BACKOFF,
+            max_backoff=MAX_BACKOFF,
+            host_rates=None,
+            sleep=time.sleep,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.host_rates = HOST_RATES if host_rates is None else host_rates
+        self.sleep = sleep
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(*self.host_rates.get(host, DEFAULT_RATE))
+            return self.buckets[host]
+
+    def _wait(self, seconds):
+        """Sleeps `seconds`, unless that would pass the deadline."""
+        left = remaining()
+        if left is not None and seconds >= left:
+            raise DeadlineExceeded(f"{left:.2f}s left, would need to wait {seconds:.2f}s")
+        if seconds > 0:
+            self.sleep(seconds)
+
+    def _timeout(self):
+        left = remaining()
+        if left is None:
+            return self.connect_timeout, self.read_timeout
+        if left <= 0:
+            raise DeadlineExceeded("No time left to fetch")
+        return min(self.connect_timeout, left), min(self.read_timeout, left)
+
+    def _backoff(self, attempt):
+        """Returns the jittered delay before retry `attempt`, or None if it shouldn't be retried."""
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        left = remaining()
+        if left is not None and delay >= left:
+            return None
+        return delay
+
+    def get(self, transport, url, headers, stream=False, record=None):
+        """
+        Returns `transport.get(url, headers, stream)`, retrying on connection errors and `RETRY_STATUSES`.
+
+        The response of the last attempt is returned even if its status
+        would have been retried.  `record`, if given, gets the number of
+        attempts made.
+        """
+        bucket = self.bucket(urlsplit(url).netloc)
+        attempt = 0
+        while True:
+            wait = bucket.reserve()
+            try:
+                self._wait(wait)
+            except DeadlineExceeded:
+                bucket.refund()
+                raise
+            if record is not None:
+                record["attempts"] = attempt + 1
+            try:
+                response = transport.get(url, headers, stream=stream, timeout=self._timeout())
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self._backoff(attempt)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self._backoff(attempt)
+                if delay is None:
+                    return response
+                response.close()
+            self.sleep(delay)
+            attempt += 1
+
+
+# The policy every fetch goes through.
+policy = FetchPolicy()
@@ -0,0 +1,59 @@
+"""
+Clean-up every scraper's output goes through before it's written.
+
+`write_to_dynamo` and `write_to_json` run `GENERAL_STEPS` over the general
+lines, so scrapers don't each need their own de-duplication.  Scrapers
+already clean the lines they extract (`normalize_all`), so it isn't redone
+here.
+"""
+
+import os
+
+# "exact" drops repeated lines; "near" also drops lines that only differ
+# from an earlier one in whitespace or case.
+DEDUPE_MODE = os.environ.get("SCRAPER_DEDUPE", "exact")
+
+
+def loose_key(line):
+    """Returns `line` with whitespace runs collapsed and case folded."""
+    return " ".join(line.split()).casefold()
+
+
+def dedupe(lines, key=None):
+    """
+    Returns `lines` without repeats, keeping the first of each in order.
+
+    Lines are compared by `key(line)` when a key function is given.
+    """
+    if key is None:
+        return list(dict.fromkeys(lines))
+    seen = set()
+    unique = []
+    for line in lines:
+        k = key(line)
+        if k not in seen:
+            seen.add(k)
+            unique.append(line)
+    return unique
+
+
+def dedupe_general(lines, mode=None):
+    """`dedupe` in `DEDUPE_MODE`, or in `mode` when given."""
+    mode = mode or DEDUPE_MODE
+    if mode == "near":
+        return dedupe(lines, loose_key)
+    if mode == "exact":
+        return dedupe(lines)
+    raise ValueError(f"Unknown dedupe mode {mode!r}, expected exact or near")
+
+
+# Applied in order to the general lines of every scraper, once they are
+# cleaned, so lines that only differed in invisible characters dedupe.
+GENERAL_STEPS = [dedupe_general]
+
+
+def clean_general(lines):
+    """Runs the general lines through `GENERAL_STEPS`."""
+    for step in GENERAL_STEPS:
+        lines = step(lines)
+    return lines
@@ -1,13 +1,190 @@
-from dataclasses import dataclass
+"""
+Reception points, one at a time or many as columns.
+
+Coordinates are kept as floats (None when unknown).  Coordinates read as
+strings, out of map links and KML files, also keep that string, which is
+what DynamoDB and the JSON files get, as they always have; floats are only
+formatted when there's no source string.
+"""
+
+from array import array
+from math import isnan, nan
+
+FIELDS = ("name", "lat", "lon", "address", "qr")
+
+
+def parse_coordinate(value):
+    """Returns `value` as a float, or None for a missing ("" or None) coordinate."""
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def format_coordinate(value):
+    """Returns the string form of a coordinate: "" when unknown, and no trailing ".0"."""
+    if value is None or isnan(value):
+        return ""
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def coordinate_text(value):
+    """Returns the source string of a coordinate assigned as `value`: strings as they are, else `format_coordinate`."""
+    if isinstance(value, str):
+        return value
+    return format_coordinate(value)
 
 
-@dataclass
 class Reception:
-    name: str = ""
-    address: str = ""
-    qr: str = ""
-    lat: str = ""
-    lon: str = ""
+    __slots__ = ("name", "address", "qr", "_lat", "_lon", "_lat_text", "_lon_text")
+
+    def __init__(self, name="", address="", qr="", lat=None, lon=None):
+        self.name = name
+        self.address = address
+        self.qr = qr
+        self.lat = lat
+        self.lon = lon
+
+    # Coordinates may be assigned as strings, as they come out of URLs and KML.
+    @property
+    def lat(self):
+        return self._lat
+
+    @lat.setter
+    def lat(self, value):
+        self._lat = parse_coordinate(value)
+        self._lat_text = coordinate_text(value)
+
+    @property
+    def lon(self):
+        return self._lon
+
+    @lon.setter
+    def lon(self, value):
+        self._lon = parse_coordinate(value)
+        self._lon_text = coordinate_text(value)
+
+    def as_dict(self):
+        """Returns the JSON shape, with the coordinates' source strings."""
+        return {
+            "name": self.name,
+            "lat": self._lat_text,
+            "lon": self._lon_text,
+            "address": self.address,
+            "qr": self.qr,
+        }
+
+    def as_dynamo(self):
+        """Returns the DynamoDB map attribute, with string coordinates."""
+        return {"M": {key: {"S": value} for key, value in self.as_dict().items()}}
+
+    def _key(self):
+        return (self.name, self.address, self.qr, self._lat, self._lon)
+
+    def __eq__(self, other):
+        if not isinstance(other, Reception):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return (
+            f"Reception(name={self.name!r}, address={self.address!r}, qr={self.qr!r}, "
+            f"lat={self._lat!r}, lon={self._lon!r})"
+        )
 
     def __str__(self):
         return self.name
+
+
+class Receptions:
+    """
+    Many reception points stored as columns, with the coordinates in
+    arrays of doubles (NaN when unknown).
+
+    Source strings that `format_coordinate` wouldn't give back, like
+    "46.500000", are kept aside in `texts`, by index.
+
+    Iterating or indexing gives `Reception` objects; the serializers read
+    the columns directly.
+    """
+
+    __slots__ = ("names", "addresses", "qrs", "lats", "lons", "texts")
+
+    def __init__(self, receptions=()):
+        self.names = []
+        self.addresses = []
+        self.qrs = []
+        self.lats = array("d")
+        self.lons = array("d")
+        # Index -> (lat, lon) source strings, where they differ from the formatted floats.
+        self.texts = {}
+        self.extend(receptions)
+
+    def append(self, r):
+        if r._lat_text != format_coordinate(r.lat) or r._lon_text != format_coordinate(r.lon):
+            self.texts[len(self.names)] = (r._lat_text, r._lon_text)
+        self.names.append(r.name)
+        self.addresses.append(r.address)
+        self.qrs.append(r.qr)
+        self.lats.append(nan if r.lat is None else r.lat)
+        self.lons.append(nan if r.lon is None else r.lon)
+
+    def extend(self, receptions):
+        for r in receptions:
+            self.append(r)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        lat, lon = self.lats[index], self.lons[index]
+        r = Reception(
+            self.names[index],
+            self.addresses[index],
+            self.qrs[index],
+            None if isnan(lat) else lat,
+            None if isnan(lon) else lon,
+        )
+        if index in self.texts:
+            r._lat_text, r._lon_text = self.texts[index]
+        return r
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, Receptions):
+            return NotImplemented
+        return as_dicts(self) == as_dicts(other)
+
+    def __repr__(self):
+        return f"Receptions({list(self)!r})"
+
+    def __getstate__(self):
+        return (self.names, self.addresses, self.qrs, self.lats, self.lons, self.texts)
+
+    def __setstate__(self, state):
+        self.names, self.addresses, self.qrs, self.lats, self.lons, self.texts = state
+
+
+def as_dicts(receptions):
+    """Serializes reception points to the JSON shape, as a list of dicts."""
+    if isinstance(receptions, Receptions):
+        lats = [format_coordinate(lat) for lat in receptions.lats]
+        lons = [format_coordinate(lon) for lon in receptions.lons]
+        for index, (lat, lon) in receptions.texts.items():
+            lats[index], lons[index] = lat, lon
+        columns = (receptions.names, lats, lons, receptions.addresses, receptions.qrs)
+        return [dict(zip(FIELDS, row)) for row in zip(*columns)]
+    return [r.as_dict() for r in receptions]
+
+
+def as_dynamo(receptions):
+    """Serializes reception points to DynamoDB map attributes."""
+    return [
+        {"M": {key: {"S": value} for key, value in d.items()}}
+        for d in as_dicts(receptions)
+    ]
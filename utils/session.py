@@ -0,0 +1,62 @@
+"""Process-wide HTTP session shared by every fetch.
+
+The session lives at module scope, so connections (and their TLS sessions)
+are reused by all scrapers in a run and by later warm Lambda invocations.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from utils.constants import HEADERS
+
+# Connections kept open per host unless the host is listed in `POOL_SIZES`.
+DEFAULT_POOL_SIZE = 2
+
+# Hosts that serve several sources get a bigger pool.
+POOL_SIZES = {
+    "www.gov.pl": 3,
+    "www.google.com": 3,
+    "www.politiadefrontiera.ro": 2,
+}
+
+_session = None
+_lock = threading.Lock()
+
+
+def _build_session():
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # `ACCEPT_ENCODING` only advertises brotli when a decoder is installed.
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    session.headers["Connection"] = "keep-alive"
+
+    default = HTTPAdapter(pool_connections=len(POOL_SIZES) + 1, pool_maxsize=DEFAULT_POOL_SIZE)
+    session.mount("http://", default)
+    session.mount("https://", default)
+    for host, size in POOL_SIZES.items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        session.mount(f"http://{host}/", adapter)
+        session.mount(f"https://{host}/", adapter)
+    return session
+
+
+def get_session():
+    """Returns the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session():
+    """Closes the shared session; the next `get_session` starts a fresh one."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,40 @@
+"""
+Clean-up of scraped text: Unicode compatibility normalization (NFKD), with
+zero-width characters removed and whitespace runs collapsed to one space.
+
+Pure-ASCII strings skip normalization altogether, and the rest are cached,
+since the same names and lines come back on every run.
+"""
+
+import functools
+import re
+import unicodedata
+
+# Invisible characters that pages leave in names and addresses, like the
+# zero-width space ending some Poland addresses.
+ZERO_WIDTH = "\u200b\u200c\u200d\u2060\ufeff"
+
+# Most distinct non-ASCII strings kept by `clean`.
+CACHE_SIZE = 4096
+
+# Much faster than `str.translate` with a deletion table.
+_ZERO_WIDTH = re.compile(f"[{ZERO_WIDTH}]+")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _clean_unicode(text):
+    text = unicodedata.normalize("NFKD", _ZERO_WIDTH.sub("", text))
+    return " ".join(text.split())
+
+
+def clean(text):
+    """Returns `text` normalized, without zero-width characters, and with whitespace collapsed."""
+    if text.isascii():
+        # Already normalized, and without zero-width characters.
+        return " ".join(text.split())
+    return _clean_unicode(text)
+
+
+def clean_all(texts):
+    """Returns `clean` of every text in `texts`, in order."""
+    return [clean(text) for text in texts]
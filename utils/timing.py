@@ -0,0 +1,134 @@
+"""
+Per-stage timing of scraper runs.
+
+Every stage (fetch, parse, extract, write, ...) is logged as one JSON line
+when it finishes, and kept so `log_summary` can aggregate the whole run:
+
+    {"stage": "fetch", "url": "https://...", "bytes": 81527, "seconds": 0.412}
+"""
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Sized
+from contextlib import contextmanager
+
+logger = logging.getLogger("scraper.timing")
+if os.environ.get("SCRAPER_TIMING_LOG", "on") != "off" and not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_records = []
+_lock = threading.Lock()
+
+
+def _emit(record):
+    with _lock:
+        _records.append(record)
+    logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Times the block as stage `name`.
+
+    Yields the record that will be logged, so the block can add fields to
+    it, e.g. `record["bytes"] = len(body)`.  A block that raises is
+    logged with the exception's type as `error`; one left early by
+    `GeneratorExit` or `KeyboardInterrupt`, like an abandoned
+    `fetch_chunks`, is logged without one.  Time spent in `paused(record)`
+    blocks isn't counted.
+    """
+    record = {"stage": name, **fields}
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start - record.pop("paused", 0), 6)
+        _emit(record)
+
+
+@contextmanager
+def paused(record):
+    """Leaves the time spent in the block out of the stage logging `record`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["paused"] = record.get("paused", 0) + time.perf_counter() - start
+
+
+def excluding(chunks, record):
+    """
+    Yields `chunks`, leaving the time spent waiting for each out of the
+    stage logging `record`, so a stage reading a body as it streams in
+    doesn't count its download as well.
+    """
+    chunks = iter(chunks)
+    while True:
+        with paused(record):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def timed(name):
+    """Decorator that times every call as stage `name`, counting the items of a returned collection."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name, function=func.__qualname__) as record:
+                result = func(*args, **kwargs)
+                if isinstance(result, Sized) and not isinstance(result, (str, bytes)):
+                    record["items"] = len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def drain():
+    """Returns and forgets the records kept so far."""
+    global _records
+    with _lock:
+        records, _records = _records, []
+    return records
+
+
+def add(records):
+    """Keeps records that were already logged elsewhere, e.g. by a worker process."""
+    with _lock:
+        _records.extend(records)
+
+
+def summarize(records):
+    """Aggregates records per stage: count, total and slowest seconds, bytes, errors."""
+    summary = {}
+    for record in records:
+        entry = summary.setdefault(record["stage"], {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0, "errors": 0})
+        entry["count"] += 1
+        entry["seconds"] += record["seconds"]
+        entry["max_seconds"] = max(entry["max_seconds"], record["seconds"])
+        entry["bytes"] += record.get("bytes", 0)
+        entry["errors"] += "error" in record
+    for entry in summary.values():
+        entry["seconds"] = round(entry["seconds"], 6)
+    return summary
+
+
+def log_summary():
+    """Logs the aggregate of every record since the last summary, and returns it."""
+    summary = summarize(drain())
+    logger.info(json.dumps({"summary": summary}))
+    return summary
@@ -0,0 +1,161 @@
+"""
+Pluggable HTTP transport behind `utils.fetch`.
+
+- `live` (default): the shared pooled session.
+- `record`: the live session, also saving every response as a cassette.
+- `replay`: serves cassettes from disk, with optional artificial latency,
+  and never touches the network.
+
+Pick one with `SCRAPER_TRANSPORT`, the cassette directory with
+`SCRAPER_CASSETTE_DIR` and replay latency, in milliseconds, with
+`SCRAPER_REPLAY_LATENCY_MS`; or call `set_transport`.
+"""
+
+import hashlib
+import json
+import os
+import random
+import time
+
+from requests.structures import CaseInsensitiveDict
+
+from utils.constants import BASE_DIR
+from utils.session import get_session
+
+DEFAULT_CASSETTE_DIR = os.path.join(BASE_DIR, ".cache", "cassettes")
+
+
+class CassetteResponse:
+    """The parts of `requests.Response` that `utils.fetch` uses, backed by bytes."""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _cassette_paths(directory, url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = os.path.join(directory, key)
+    return base + ".body", base + ".json"
+
+
+def write_cassette(directory, url, status_code, headers, body):
+    """Saves one response under `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    body_path, meta_path = _cassette_paths(directory, url)
+    with open(body_path, "wb") as f:
+        f.write(body)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "status": status_code, "headers": dict(headers)}, f, indent=2)
+
+
+def read_cassette(directory, url):
+    """Returns the saved `CassetteResponse` for `url`.  Raises FileNotFoundError if there is none."""
+    body_path, meta_path = _cassette_paths(directory, url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No cassette for {url} in {directory}") from None
+    return CassetteResponse(meta["status"], meta["headers"], body)
+
+
+class LiveTransport:
+    """Fetches over the shared pooled session."""
+
+    def get(self, url, headers, stream=False, timeout=None):
+        return get_session().get(url, headers=headers, stream=stream, timeout=timeout)
+
+
+class RecordingTransport:
+    """Fetches live and saves every response as a cassette."""
+
+    def __init__(self, directory, inner=None):
+        self.directory = directory
+        self.inner = inner or LiveTransport()
+
+    def get(self, url, headers, stream=False, timeout=None):
+        # Recording needs the whole body, so even streamed requests are read in full.
+        with self.inner.get(url, headers, timeout=timeout) as response:
+            content = response.content
+            status_code = response.status_code
+            response_headers = dict(response.headers)
+        # Don't let a 304 to a conditional request overwrite the recorded body.
+        if status_code != 304:
+            # The body is stored decoded, so drop headers that describe the wire format.
+            for header in ("Content-Encoding", "Transfer-Encoding", "Content-Length"):
+                response_headers.pop(header, None)
+            write_cassette(self.directory, url, status_code, response_headers, content)
+        return CassetteResponse(status_code, response_headers, content)
+
+
+class ReplayTransport:
+    """
+    Serves recorded cassettes, never touching the network.
+
+    Every request waits `latency` seconds, give or take up to `jitter`
+    seconds, to stand in for the round trip.  A request whose
+    `If-None-Match` matches the cassette's `ETag` gets a 304, like the
+    real server would answer.
+    """
+
+    def __init__(self, directory, latency=0.0, jitter=0.0):
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+
+    def get(self, url, headers, stream=False, timeout=None):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        response = read_cassette(self.directory, url)
+        etag = response.headers.get("ETag")
+        if etag and headers.get("If-None-Match") == etag:
+            return CassetteResponse(304, response.headers, b"")
+        return response
+
+
+def _from_environment():
+    mode = os.environ.get("SCRAPER_TRANSPORT", "live")
+    directory = os.environ.get("SCRAPER_CASSETTE_DIR", DEFAULT_CASSETTE_DIR)
+    if mode == "live":
+        return LiveTransport()
+    if mode == "record":
+        return RecordingTransport(directory)
+    if mode == "replay":
+        latency = float(os.environ.get("SCRAPER_REPLAY_LATENCY_MS", "0")) / 1000
+        return ReplayTransport(directory, latency)
+    raise ValueError(f"Unknown SCRAPER_TRANSPORT {mode!r}, expected live, record or replay")
+
+
+_transport = None
+
+
+def get_transport():
+    """Returns the transport in use, picking it from the environment on first use."""
+    global _transport
+    if _transport is None:
+        _transport = _from_environment()
+    return _transport
+
+
+def set_transport(transport):
+    """Replaces the transport in use; None goes back to the environment's choice."""
+    global _transport
+    _transport = transport
@@ -1,63 +1,63 @@
 import json
 import logging
-import unicodedata
-import requests
-from bs4 import BeautifulSoup
 from utils.constants import LOGFILE_PATH, HEADERS
-from utils.reception import Reception
+from utils.coordinates import extract as extract_coordinates
+from utils.fetch import fetch
+from utils.parsing import DEFAULT_PARSER, parse_html
+from utils.postprocess import clean_general
+from utils.reception import as_dicts
+from utils.text import clean, clean_all
+from utils.timing import stage
+from utils.warm_cache import remember
 
 def normalize(text):
-  """Normalizes the provided text. This is needed to get rid of weird entries like \xa0."""
-  return unicodedata.normalize("NFKD", text)
+  """Normalizes the provided text. This is needed to get rid of weird entries like \xa0 and \u200b."""
+  return clean(text)
 
-def get_website_content(url, headers=HEADERS):
-  """Gets the website content with BS4."""
-  website = requests.get(url, headers=headers)
-  return BeautifulSoup(website.content, 'html.parser')
+def normalize_all(texts):
+  """Normalizes every text in `texts` in one go."""
+  return clean_all(texts)
 
-def get_reception_points(
-        kml: dict,
-        folder_name_whitelist=None,
-        style_urls_blacklist=None,
-):
-  if style_urls_blacklist is None:
-    style_urls_blacklist = []
-  reception_points: list[Reception] = []
-  folders = kml["kml"]["Document"]["Folder"]
-  for folder in folders:
-    if folder_name_whitelist is None or any(
-            value in normalize(folder["name"])
-            for value in folder_name_whitelist
-    ):
-      if "Placemark" in folder.keys():
-        for placemark in folder["Placemark"]:
-          if placemark["styleUrl"] not in style_urls_blacklist:
-            r = Reception()
-            r.name = normalize(placemark["name"])
-            coord = placemark["Point"]["coordinates"].split(',')
-            r.lon = coord[0].strip()
-            r.lat = coord[1].strip()
-            reception_points.append(r)
-  return reception_points
+def get_website_content(url, headers=HEADERS, parser=DEFAULT_PARSER, target=None, encoding=None):
+  """
+  Gets the website content with BS4, or lxml for the `lxml-direct` parser.
+
+  Pass the `(tag, class)` of the container you need as `target` to only
+  parse that part of the page, and the page's `encoding` if it's known, to
+  skip detecting it.
+  """
+  body = fetch(url, headers=headers)
+  with stage("parse", url=url, parser=parser, bytes=len(body)):
+    return parse_html(body, parser, target, encoding)
+
+def extract_website(url, extract, headers=HEADERS, parser=DEFAULT_PARSER, target=None, encoding=None):
+  """
+  Returns `extract(content)` of the content `get_website_content` gets.
+
+  The result is kept in the warm cache by URL and content hash, so a warm
+  invocation fetching the same page again doesn't parse and extract it again.
+  """
+  body = fetch(url, headers=headers)
+  def parse_and_extract():
+    with stage("parse", url=url, parser=parser, bytes=len(body)):
+      content = parse_html(body, parser, target, encoding)
+    return extract(content)
+  return remember(url, body, extract.__qualname__, parse_and_extract)
 
 def gmaps_url_to_lat_lon(url):
-  """Converts a Google maps URL string into latitude and longitude."""
-  if "!3d" in url:
-    return url.split("!3d")[1].split("!4d")
-  else:
-    return url.split("/")[6].split(",")
+  """
+  Converts a Google maps URL string into latitude and longitude floats.
+
+  Raises ValueError if it has none; see `utils.coordinates.extract` for a
+  version returning None instead.
+  """
+  coordinates = extract_coordinates(url)
+  if coordinates is None:
+    raise ValueError(f"No coordinates in {url}")
+  return coordinates
 
 def write_to_json(filename, text_arr, reception_arr, source):
-  reception = []
-  for rec in reception_arr:
-    reception.append({
-      "name": rec.name,
-      "lat": rec.lat,
-      "lon": rec.lon,
-      "address": rec.address,
-      "qr": rec.qr,
-    })
-  data = {"general": text_arr, "reception": reception, "source": source}
+  data = {"general": clean_general(text_arr), "reception": as_dicts(reception_arr), "source": source}
   with open(filename, "w", encoding="utf-8") as f:
     json.dump(data, f, indent=2, ensure_ascii=False)
 
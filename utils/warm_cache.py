@@ -0,0 +1,137 @@
+"""
+In-memory cache kept across warm Lambda invocations.
+
+Bursts of invocations, like one per `country` event, fetch the same pages
+within minutes of each other.  `bodies` keeps every fetched body for
+`WARM_CACHE_TTL` seconds, so those fetches don't go out again, and
+`results` keeps what was extracted from a page by its URL and content hash,
+so the same content isn't parsed twice.  Both hold at most
+`WARM_CACHE_MAX_BYTES`, evicting the least recently used entries first.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.constants import WARM_CACHE_ENABLED, WARM_CACHE_MAX_BYTES, WARM_CACHE_TTL
+
+
+class TTLCache:
+    """
+    Entries that expire `ttl` seconds after they're stored, up to `max_bytes`
+    in total by the size each is stored with.
+    """
+
+    def __init__(self, ttl, max_bytes, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Key -> (expiry, size, value), least recently used first.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the value stored under `key`, or None if there's none or it expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value, size):
+        """Stores `value` under `key`, unless it alone is bigger than the whole cache."""
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            now = self.clock()
+            self._entries[key] = (now + self.ttl, size, value)
+            self.size += size
+            if self.size > self.max_bytes:
+                self._evict(now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _drop(self, key):
+        self.size -= self._entries.pop(key)[1]
+
+    def _evict(self, now):
+        """Drops expired entries, then the least recently used, until the cache fits."""
+        for key in [key for key, entry in self._entries.items() if entry[0] <= now]:
+            self._drop(key)
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+
+def content_hash(content):
+    """Returns the SHA-256 hex digest of a body, bytes or text."""
+    if isinstance(content, str):
+        content = content.encode("utf-8", errors="surrogatepass")
+    return hashlib.sha256(content).hexdigest()
+
+
+# URL -> fetched body, or None when the warm cache is off.
+bodies = TTLCache(WARM_CACHE_TTL, WARM_CACHE_MAX_BYTES) if WARM_CACHE_ENABLED else None
+
+# (URL, content hash, name) -> extracted result, or None when the warm cache is off.
+results = TTLCache(WARM_CACHE_TTL, WARM_CACHE_MAX_BYTES) if WARM_CACHE_ENABLED else None
+
+# Number of `fresh` blocks running, in any thread.
+_fresh = 0
+_fresh_lock = threading.Lock()
+
+
+@contextmanager
+def fresh():
+    """Fetches every page again inside the block, still keeping the new bodies for later."""
+    global _fresh
+    with _fresh_lock:
+        _fresh += 1
+    try:
+        yield
+    finally:
+        with _fresh_lock:
+            _fresh -= 1
+
+
+def body(url):
+    """Returns the body of `url` fetched within the TTL, or None, always None inside `fresh`."""
+    if bodies is None or _fresh:
+        return None
+    return bodies.get(url)
+
+
+def remember(url, content, name, compute):
+    """
+    Returns `compute()`, reusing its result for the same `url`, `content`
+    and `name` while it's cached.
+
+    `name` tells apart different extractions from the same page.  Results
+    are counted at the size of the content they came from, and are shared
+    between invocations, so callers mustn't modify them.
+    """
+    if results is None:
+        return compute()
+    key = (url, content_hash(content), name)
+    value = results.get(key)
+    if value is None:
+        value = compute()
+        results.put(key, value, len(content))
+    return value